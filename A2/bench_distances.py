@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+
+# Compares the single-source distance functions in tutorial07code.py against graphs.distancesFrom
+# on random sparse graphs.  Usage: bench_distances.py [n ...]  (default sizes 1000 10000 100000)
+#
+# distances1, distances2 and distances3 call graphs.distance once per vertex, so they are only run
+# on graphs with at most SLOW_LIMIT vertices.
+
+import sys
+import random
+import time
+
+import graphs
+import tutorial07code
+
+SLOW_LIMIT = 2000
+AVERAGE_DEGREE = 4
+
+def randomGraph(n, seed=0):
+   """Returns a random graph (V, E) on n vertices with about AVERAGE_DEGREE * n / 2 edges."""
+   rng = random.Random(seed)
+   V = set(range(n))
+   E = { (rng.randrange(n), rng.randrange(n)) for _ in range(AVERAGE_DEGREE * n // 2) }
+   E = { (u, v) for (u, v) in E if u != v }
+   return V, E | { (v, u) for (u, v) in E }
+
+def timed(f, *args):
+   """Returns (seconds, result) for the call f(*args)."""
+   start = time.perf_counter()
+   result = f(*args)
+   return time.perf_counter() - start, result
+
+def main(sizes):
+   variants = [
+      ('distances1', tutorial07code.distances1, True),
+      ('distances2', tutorial07code.distances2, True),
+      ('distances3', tutorial07code.distances3, True),
+      ('distances4', tutorial07code.distances4, False),
+      ('distancesFrom', graphs.distancesFrom, False),
+      ('distancesFrom (IndexedGraph)', None, False),
+   ]
+   print(f'{"n":>8}  {"variant":<30} {"seconds":>10}')
+   for n in sizes:
+      V, E = randomGraph(n)
+      G = graphs.IndexedGraph(V, E)
+      expected = None
+      for name, f, slow in variants:
+         if slow and n > SLOW_LIMIT:
+            print(f'{n:>8}  {name:<30} {"skipped":>10}')
+            continue
+         if f is None:
+            seconds, d = timed(graphs.distancesFrom, V, G, 0)
+         else:
+            seconds, d = timed(f, V, E, 0)
+         d = { v: dist for v, dist in d.items() if dist != float('inf') }   # distances1-3 include unreachable vertices
+         if expected is None: expected = d
+         assert d == expected, f'{name} disagrees with the earlier variants'
+         print(f'{n:>8}  {name:<30} {seconds:>10.4f}')
+
+if __name__ == '__main__':
+   main([ int(n) for n in sys.argv[1:] ] or [ 1000, 10000, 100000 ])
@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from collections.abc import Mapping
+from functools import cached_property
+
+# Binary file format written by save and read by load, all integers little-endian:
+#   header: magic, format version, number of vertices n, number of edges m, length of the vertex table in bytes,
+#           1 if the edges are symmetric and 0 if not
+#   vertex table: the pickled list of vertices, padded with zero bytes to a multiple of 8 bytes
+#   offsets: n + 1 signed 64 bit integers
+#   neighbours: m signed 64 bit integers
+MAGIC = b'CSRGRAPH'
+VERSION = 1
+_header = struct.Struct('<8sQQQQQ')
+
+class CSRGraph:
+   """A graph stored in compressed sparse row (CSR) form, for graphs too large to hold as a set of edge tuples.
+
+   Vertices are numbered 0, ..., n-1.  G.vertices is the list of vertices in that order and G.index is a
+   dictionary from vertices to their number.  The out-neighbours of vertex number i are the numbers
+   G.neighbours[G.offsets[i]:G.offsets[i+1]], in increasing order, so each edge costs 8 bytes rather than
+   a tuple in a set.  An undirected graph stores both (u,v) and (v,u), as the edge sets in graphs.py do.
+
+   A CSRGraph behaves as an edge set: (u,v) in G, iteration over the (u,v) pairs and len(G) all work, so it can
+   be passed as E to the functions in graphs.py and digraphs.py.  G.adj is a read-only dictionary-like view from
+   each vertex to its list of neighbours, which those functions use in place of building an adjacency dictionary.
+
+   offsets and neighbours can be any sequence of integers, such as an array('q') or a memoryview.
+   G.index is only built the first time it is needed.
+
+   G.symmetric records whether every edge (u,v) has its reverse (v,u), i.e. whether G is an undirected graph,
+   or is None if that isn't known yet.  fromGraph and load set it, so graphs.py needn't scan the edges itself."""
+
+   def __init__(self, vertices, offsets, neighbours, symmetric=None):
+      self.vertices = vertices
+      self.offsets = offsets
+      self.neighbours = neighbours
+      self.symmetric = symmetric
+      self.adj = _CSRAdjacency(self)
+
+   @cached_property
+   def index(self):
+      return { v: i for i, v in enumerate(self.vertices) }
+
+   @classmethod
+   def fromGraph(cls, V, E):
+      """Builds a CSRGraph from a graph (V, E), directed or undirected.  Edges with an end not in V are ignored.
+      E is iterated over twice, so it must be a collection rather than an iterator."""
+      vertices = list(V)
+      index = { v: i for i, v in enumerate(vertices) }
+      n = len(vertices)
+
+      # offsets[i+1] - offsets[i] is the out-degree of vertex i
+      offsets = array('q', bytes(8 * (n + 1)))
+      for (u, v) in E:
+         if u in index and v in index:
+            offsets[index[u] + 1] += 1
+      for i in range(n):
+         offsets[i + 1] += offsets[i]
+
+      # place each edge in the next free slot of its row, then sort the rows
+      neighbours = array('q', bytes(8 * offsets[n]))
+      nextSlot = array('q', offsets[:n])
+      for (u, v) in E:
+         if u in index and v in index:
+            i = index[u]
+            neighbours[nextSlot[i]] = index[v]
+            nextSlot[i] += 1
+      for i in range(n):
+         neighbours[offsets[i]:offsets[i + 1]] = array('q', sorted(neighbours[offsets[i]:offsets[i + 1]]))
+
+      G = cls(vertices, offsets, neighbours)
+      G.isSymmetric()
+      return G
+
+   def toGraph(self):
+      """Returns the graph as a pair (V, E) of a vertex set and an edge set."""
+      return set(self.vertices), set(self)
+
+   def isSymmetric(self):
+      """Returns True if every edge (u,v) has its reverse (v,u).  Only checked the first time, then G.symmetric is used."""
+      if self.symmetric is None:
+         offsets, neighbours = self.offsets, self.neighbours
+         self.symmetric = all(
+            k < offsets[j + 1] and neighbours[k] == i
+            for i in range(len(self.vertices))
+            for j in self.neighbourIndices(i)
+            for k in (bisect_left(neighbours, i, offsets[j], offsets[j + 1]),)   # rows are sorted
+         )
+      return self.symmetric
+
+   def neighbourIndices(self, i):
+      """Returns the numbers of the out-neighbours of vertex number i, in increasing order."""
+      return self.neighbours[self.offsets[i]:self.offsets[i + 1]]
+
+   def degree(self, i):
+      """Returns the out-degree of vertex number i."""
+      return self.offsets[i + 1] - self.offsets[i]
+
+   def __contains__(self, edge):
+      u, v = edge
+      i, j = self.index.get(u), self.index.get(v)
+      if i is None or j is None: return False
+      start, end = self.offsets[i], self.offsets[i + 1]
+      k = bisect_left(self.neighbours, j, start, end)   # rows are sorted, so binary search
+      return k < end and self.neighbours[k] == j
+
+   def __iter__(self):
+      vertices = self.vertices
+      for i, u in enumerate(vertices):
+         for j in self.neighbourIndices(i):
+            yield u, vertices[j]
+
+   def __len__(self):
+      return len(self.neighbours)
+
+   def __repr__(self):
+      return f'CSRGraph({len(self.vertices)} vertices, {len(self)} edges)'
+
+def _int64(a):
+   """Returns the sequence of integers a as an array('q') or memoryview of 8 byte integers, copying it only if needed."""
+   if isinstance(a, array) and a.itemsize == 8 and a.typecode in 'qlQL': return a
+   if isinstance(a, memoryview) and a.itemsize == 8 and a.format in ('q', 'l', 'Q', 'L'): return a
+   return array('q', a)
+
+def _littleEndian(a):
+   """Returns the array('q') or memoryview a as a little-endian buffer of 64 bit integers, for writing to a file."""
+   if sys.byteorder == 'little': return a
+   a = array('q', a)
+   a.byteswap()
+   return a
+
+def save(G, filename):
+   """Writes the CSRGraph G to filename in the binary format read by load, along with whether it is symmetric.
+   The vertices are pickled, so they must be picklable."""
+   names = pickle.dumps(list(G.vertices), protocol=pickle.HIGHEST_PROTOCOL)
+   names += bytes(-len(names) % 8)                           # pad so the arrays are 8 byte aligned
+   with open(filename, 'wb') as f:
+      f.write(_header.pack(MAGIC, VERSION, len(G.vertices), len(G.neighbours), len(names), int(G.isSymmetric())))
+      f.write(names)
+      f.write(_littleEndian(_int64(G.offsets)))
+      f.write(_littleEndian(_int64(G.neighbours)))
+
+def load(filename):
+   """Opens a graph written by save as a CSRGraph without reading the arrays into memory.
+
+   The file is memory-mapped and G.offsets and G.neighbours are read-only memoryviews of it, so loading
+   only costs reading the header and unpickling the vertex table, and the operating system pages the
+   edges in as they are used.  Whether the graph is symmetric is read from the file rather than checked.
+   The vertex table is unpickled, so only load files from trusted sources.
+   On big-endian machines the arrays are copied and byte swapped instead."""
+   with open(filename, 'rb') as f:
+      mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)   # stays open while the memoryviews use it
+
+   if len(mm) < _header.size:
+      raise ValueError(f'{filename} is too short to be a CSR graph file.')
+   magic, version, n, m, namesLength, symmetric = _header.unpack_from(mm, 0)
+   if magic != MAGIC or version != VERSION:
+      raise ValueError(f'{filename} is not a version {VERSION} CSR graph file.')
+
+   start = _header.size
+   if len(mm) != start + namesLength + 8 * (n + 1) + 8 * m:
+      raise ValueError(f'{filename} is truncated or corrupt: its length does not match its header.')
+
+   vertices = pickle.loads(mm[start:start + namesLength])
+   start += namesLength
+   offsets = memoryview(mm)[start:start + 8 * (n + 1)].cast('q')
+   start += 8 * (n + 1)
+   neighbours = memoryview(mm)[start:start + 8 * m].cast('q')
+
+   if sys.byteorder != 'little':
+      offsets, neighbours = _littleEndian(offsets), _littleEndian(neighbours)
+   return CSRGraph(vertices, offsets, neighbours, bool(symmetric))
+
+class _CSRAdjacency(Mapping):
+   """Read-only view of a CSRGraph as a dictionary from each vertex to the list of its out-neighbours."""
+
+   def __init__(self, G):
+      self.G = G
+
+   def __getitem__(self, v):
+      G = self.G
+      return [ G.vertices[j] for j in G.neighbourIndices(G.index[v]) ]
+
+   def __iter__(self):
+      return iter(self.G.vertices)
+
+   def __len__(self):
+      return len(self.G.vertices)
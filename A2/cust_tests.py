@@ -209,6 +209,71 @@ def assert_no_loops(s, f):
    #    self.checkGameGroups(assignedReferees, schedule)
    # #
 
+class TestRefereesCost(unittest.TestCase):
+   def test_cost(self):
+      games = {('Frank', 'Gina'), ('Hank', 'Ivy')}
+      preferred = {('Frank', 'Gina'): 'David', ('Hank', 'Ivy'): 'Joe'}
+      cost = lambda g, r: 0 if preferred[g] == r else 1
+      self.assertEqual(P.referees(games, os.path.join(scriptDirectory, 'referees1.csv'), cost), preferred)
+
+
+   def test_cost_impossible(self):
+      games = {('Ashley', 'Charlie'), ('Ellie', 'David'), ('Bob', 'Alice')}
+      cost = lambda g, r: 1
+      self.assertIsNone(P.referees(games, os.path.join(scriptDirectory, 'referees1.csv'), cost))
+
+
+class TestRefereesCapacity(unittest.TestCase):
+   def checkAssignment(self, games, capacity, assignment):
+      self.assertEqual(set(assignment), games)
+      for g, r in assignment.items():
+         self.assertNotIn(r, g)
+      for r in set(assignment.values()):
+         self.assertLessEqual(list(assignment.values()).count(r), capacity.get(r, 0))
+
+
+   def test_capacity(self):
+      games = {('Frank', 'Gina'), ('Hank', 'Ivy'), ('Jack', 'Kate'), ('Alice', 'Bob')}
+      capacity = {'Joe': 2, 'Rene': 1, 'David': 1}
+      assignment = P.referees(games, os.path.join(scriptDirectory, 'referees1.csv'), capacity=capacity)
+      self.checkAssignment(games, capacity, assignment)
+      self.assertEqual(assignment[('Alice', 'Bob')], 'Rene')
+
+
+   def test_capacity_too_small(self):
+      games = {('Frank', 'Gina'), ('Hank', 'Ivy'), ('Jack', 'Kate'), ('Liam', 'Mia')}
+      self.assertIsNone(P.referees(games, os.path.join(scriptDirectory, 'referees1.csv'), capacity=1))
+
+
+   def test_capacity_and_cost(self):
+      games = {('Frank', 'Gina'), ('Hank', 'Ivy'), ('Jack', 'Kate')}
+      capacity = {'Joe': 2, 'Rene': 2, 'David': 2}
+      cost = lambda g, r: 0 if r == 'David' or g == ('Jack', 'Kate') and r == 'Rene' else 1
+      assignment = P.referees(games, os.path.join(scriptDirectory, 'referees1.csv'), cost, capacity)
+      self.checkAssignment(games, capacity, assignment)
+      self.assertEqual(assignment[('Jack', 'Kate')], 'Rene')
+      self.assertEqual(list(assignment.values()).count('David'), 2)
+
+
+class TestGameGroupsApprox(unittest.TestCase):
+   def test_time_limit(self):
+      assignedReferees = {
+         ('Alice', 'Bob'): 'Rene',
+         ('Elaine', 'Charlie'): 'Dave',
+         ('Rene', 'Elaine'): 'Alice',
+         ('Dave', 'Bob'): 'Charlie',
+         ('Alice', 'Rene'): 'Dave',
+         ('Dave', 'Elaine'): 'Rene'
+      }
+      schedule = P.gameGroups(assignedReferees, timeLimit=0.1)
+      self.assertEqual(sum( len(gameGroup) for gameGroup in schedule), len(assignedReferees))
+      for gameGroup in schedule:
+         for u in gameGroup:
+            for v in gameGroup:
+               if u != v:
+                  self.assertTrue((set(u) | { assignedReferees[u] }).isdisjoint(set(v) | { assignedReferees[v] }))
+
+
 class TestGamesSchedule(unittest.TestCase):
    def test_no_loops(self):
       assert_no_loops(self, P.gameSchedule)
@@ -232,6 +297,62 @@ class TestGamesSchedule(unittest.TestCase):
       ])
 
 
+   def test_layered(self):
+      assignedReferees =  {
+         ('Edward', 'Julia'): 'Faye Valentine',
+         ('Faye Valentine', 'Edward'): 'Evalyn',
+         ('Jet Black', 'Ein'): 'Spike Spiegel',
+         ('Julia', 'Spike Spiegel'): 'Waymond',
+         ('Spike Spiegel', 'Vicious'): 'Faye Valentine',
+         ('Vicious', 'Jet Black'): 'Julia'
+      }
+
+      gameGroups = [
+         {('Spike Spiegel', 'Vicious')},
+         {('Vicious', 'Jet Black')},
+         {('Jet Black', 'Ein'), ('Edward', 'Julia')},
+         {('Faye Valentine', 'Edward'), ('Julia', 'Spike Spiegel')}
+      ]
+
+      order = P.gameSchedule(assignedReferees, gameGroups, layered=True)
+      self.assertEqual(order, [
+         [ {('Julia', 'Spike Spiegel'), ('Faye Valentine', 'Edward')} ],
+         [ {('Spike Spiegel', 'Vicious') } ],
+         [ {('Jet Black', 'Ein'), ('Edward', 'Julia')} ],
+         [ {('Vicious', 'Jet Black')} ]
+      ])
+
+
+   def test_layered_independent(self):
+      assignedReferees = {
+         ('Alice', 'Bob'): 'Charlie',
+         ('Dave', 'Eve'): 'Frank'
+      }
+
+      gameGroups = [
+         { ('Alice', 'Bob') },
+         { ('Dave', 'Eve') },
+      ]
+
+      order = P.gameSchedule(assignedReferees, gameGroups, layered=True)
+      self.assertEqual(len(order), 1)
+      self.assertCountEqual(order[0], gameGroups)
+
+
+   def test_layered_cycle(self):
+      assignedReferees = {
+         ('Alice', 'Bob'): 'Charlie',
+         ('Charlie', 'Dave'): 'Alice'
+      }
+
+      gameGroups = [
+         { ('Alice', 'Bob') },
+         { ('Charlie', 'Dave') },
+      ]
+
+      self.assertIsNone(P.gameSchedule(assignedReferees, gameGroups, layered=True))
+
+
 
 if __name__ == "__main__":
     unittest.main(argv=["-b"])
@@ -2,6 +2,8 @@
 
 # WARNING!  Do not edit this file!  The original digraphs.py will be used when marking your code.
 
+from csrgraphs import CSRGraph
+
 def arbitrary(S):
     """Return an arbitrary element of S, or None if it is empty."""
     if not S: return None
@@ -27,61 +29,264 @@ def NS_in(V, E, S):
     """Return the in-neighbours of vertices S in the graph (V,E), i.e. the set of vertices v where there is an edge from v to u for some u in S."""
     return { v for v in V for u in S if (v,u) in E }
 
-def distanceClasses(V, E, u, D=None):
+def outAdjacency(E):
+   """Returns a dictionary with keys vertices and values the set of out-neighbours of that vertex given edges E.
+   Vertices with no out-edges are not included.  For a CSRGraph the stored adjacency is returned, whose values are lists."""
+   if isinstance(E, CSRGraph): return E.adj
+
+   adj = dict()
+   for (u, v) in E:
+      adj.setdefault(u, set()).add(v)
+   return adj
+
+def bfs(V, E, u):
+   """Breadth first search of the directed graph (V,E) starting from vertex u, following the direction of edges.
+   Runs in O(|V| + |E|) time.  Returns (D, dist, parents) where
+     D is the list of distance classes from u, as returned by distanceClasses,
+     dist is a dictionary with keys the vertices reachable from u and values their distance from u,
+     parents is a dictionary with keys the vertices reachable from u and values their parent in a shortest path tree.  u has parent None."""
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   adj = outAdjacency(E)
+   D = [ {u} ]                               # D[0] = D_0 = {u}
+   dist = { u: 0 }
+   parents = { u: None }
+   while True:
+      Dnew = set()                           # D_{j} = N_{out V_j}(D_{j-1})
+      for v in D[-1]:
+         for w in adj.get(v, ()):
+            if w in V and w not in dist:
+               dist[w] = len(D)
+               parents[w] = v
+               Dnew.add(w)
+      if len(Dnew) == 0: return D, dist, parents   # Didn't find any more vertices.  All done or G is disconnected.
+      D.append(Dnew)
+
+def distanceClasses(V, E, u):
    """Given a graph (V,E) and a starting vertex u, outputs a list of distances classes.
    That is, returns a partition of the vertices into sets of fixed distances from u, where u is in the distance class for distance 0.
-   Behaviour is undefined if the graph is disconnected.
+   If some vertices can't be reached from u then they are not included.
 
    This version differs from that in graphs.py in that when the graph is directed then all paths considered follow the direction of edges.
    For example, D[1] is the set of vertices v where there is an edge from u to v.  Edges from v to u are not considered.
    """
-   if D is None:                             # j = 0 case
-      D = [ {u} ]                            # D[0] = D_0 = {u}
-      return distanceClasses(V, E, None, D)  # recurse to get remaining distance classes
-
-   Vnew = V - D[-1]                          # V_{j} = V_{j-1} / D_{j-1}
-   Dnew = D + [ NS_out(Vnew, E, D[-1]) ]     # D_{j} = N_{in V_j}(D_{j-1})
-   if len(Dnew[-1]) == 0: return D           # Didn't find any more vertices.  All done or G is disconnected.
-   return distanceClasses(Vnew, E, None, Dnew)
+   return bfs(V, E, u)[0]
 
 def hasInEdge(V, E, v):
    """Given a directed graph (V, E) and a vertex v, return whether v has any edges going into it."""
    return len(N_in(V, E, v)) != 0
 
-def topOrdering(V, E, ordering=None):
-   """Given a directed graph (V, E) return a topological ordering if it exists, otherwise returns None."""
-   if ordering is None:
-      ordering = []
-
-   Gnew = { v for v in V if not hasInEdge(V, E, v) }
-   if len(Gnew) == 0: return None         # there must be a cycle
-   ordering = ordering + list(Gnew)
-   Vnew = V - Gnew
-   if len(Vnew) == 0: return ordering      # no more vertices
-   return topOrdering(Vnew, E, ordering)
-
-def findPath(V, E, start, end, path = None):
+def _findCycle(V, adj):
+   """Given a set of vertices V where every vertex has an edge into it from another vertex of V,
+   returns a directed cycle within V as a list of vertices, each with an edge to the next and the last with an edge to the first."""
+   pred = dict()                           # one in-neighbour in V for each vertex of V
+   for u in V:
+      for w in adj.get(u, ()):
+         if w in V: pred.setdefault(w, u)
+
+   # Walk backwards along edges until a vertex repeats.  The walk from its first visit on is a cycle.
+   walk = []
+   position = dict()
+   v = arbitrary(V)
+   while v not in position:
+      position[v] = len(walk)
+      walk.append(v)
+      v = pred[v]
+   cycle = walk[position[v]:]
+   cycle.reverse()                         # follow the edges forwards
+   return cycle
+
+def _kahnLayers(V, adj):
+   """Kahn's algorithm on the vertex set V with out-adjacency dictionary adj, in O(|V| + |E|) time.
+   Returns the list of layers, where each layer is the set of vertices with no in-edges once all earlier
+   layers are removed.  If there is a cycle, the vertices on or after it are in no layer."""
+   inDegree = { v: 0 for v in V }
+   for u in V:
+      for w in adj.get(u, ()):
+         if w in inDegree: inDegree[w] += 1
+
+   layers = []
+   layer = { v for v in V if inDegree[v] == 0 }
+   while layer:
+      layers.append(layer)
+      Lnew = set()                         # vertices whose last in-edge comes from this layer
+      for v in layer:
+         for w in adj.get(v, ()):
+            if w in inDegree:
+               inDegree[w] -= 1
+               if inDegree[w] == 0: Lnew.add(w)
+      layer = Lnew
+   return layers
+
+def topLayersWitness(V, E):
+   """Given a directed graph (V, E) returns (layers, None) where layers is a list of sets of vertices: first the vertices
+   with no in-edges, then the vertices with no in-edges once those are removed, and so on.  There are no edges within
+   a layer, so each layer can be processed in parallel once the earlier layers are done.
+   If there is no topological ordering then returns (None, cycle) as topOrderingWitness does.
+   Takes O(|V| + |E|) time."""
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   adj = outAdjacency(E)
+   layers = _kahnLayers(V, adj)
+
+   layered = sum(len(layer) for layer in layers)
+   if layered < len(V):                    # the vertices left all have in-edges, so there must be a cycle
+      return None, _findCycle(V.difference(*layers), adj)
+   return layers, None
+
+def topLayers(V, E):
+   """Given a directed graph (V, E) returns the layers of topLayersWitness, or None if there is a cycle."""
+   return topLayersWitness(V, E)[0]
+
+def topOrderingWitness(V, E):
+   """Given a directed graph (V, E) returns (ordering, None) where ordering is a topological ordering if it exists,
+   otherwise (None, cycle) where cycle is a directed cycle as a list of vertices, each with an edge to the next
+   and the last with an edge to the first.
+
+   Uses Kahn's algorithm, in O(|V| + |E|) time: count the in-edges of every vertex, then repeatedly take the
+   vertices with no remaining in-edges and remove their out-edges.  The ordering is layer by layer like the
+   original recursive topOrdering: first all vertices with no in-edges, then all vertices with no in-edges
+   once those are removed, and so on."""
+   layers, cycle = topLayersWitness(V, E)
+   if layers is None: return None, cycle
+   return [ v for layer in layers for v in layer ], None
+
+def topOrdering(V, E):
+   """Given a directed graph (V, E) return a topological ordering if it exists, otherwise returns None.
+   Use topOrderingWitness to also get a cycle when there is no topological ordering."""
+   return topOrderingWitness(V, E)[0]
+
+class DynamicTopOrdering:
+   """A topological ordering of a directed graph that is kept up to date as vertices and edges are added and removed,
+   using the Pearce-Kelly algorithm.
+
+   Adding an edge (u,v) where u is already before v costs O(1).  Otherwise only the vertices between v and u in the
+   ordering that are reachable from v, or that reach u, are visited and moved, rather than ordering the whole graph
+   again.  An edge that would make a cycle is detected straight away and not added.  Removing edges or vertices never
+   invalidates an ordering, so it costs O(1) per edge."""
+
+   def __init__(self, V=(), E=()):
+      """Starts from the directed graph (V, E), which must have a topological ordering.  Edges with an end not in V are ignored."""
+      ordering, cycle = topOrderingWitness(V, E)
+      if ordering is None: raise ValueError(f'Graph has a cycle {cycle}.  No topological ordering.')
+
+      self.position = { v: i for i, v in enumerate(ordering) }   # place of each vertex in the ordering
+      self._vertexAt = list(ordering)                            # inverse of position.  None where a vertex was removed
+      self._holes = 0                                            # number of Nones in _vertexAt
+      self.out = { v: set() for v in ordering }
+      self.into = { v: set() for v in ordering }
+      for (u, v) in E:
+         if u in self.position and v in self.position:
+            self.out[u].add(v)
+            self.into[v].add(u)
+
+   def ordering(self):
+      """Returns the current topological ordering as a list of vertices."""
+      return [ v for v in self._vertexAt if v is not None ]
+
+   def addVertex(self, v):
+      """Adds the vertex v, with no edges, at the end of the ordering."""
+      if v in self.position: return
+      self.position[v] = len(self._vertexAt)
+      self._vertexAt.append(v)
+      self.out[v] = set()
+      self.into[v] = set()
+
+   def removeVertex(self, v):
+      """Removes the vertex v and its edges, if it is a vertex."""
+      if v not in self.position: return
+      for w in self.out.pop(v):
+         self.into[w].discard(v)
+      for w in self.into.pop(v):
+         self.out[w].discard(v)
+      self._vertexAt[self.position.pop(v)] = None
+      self._holes += 1
+      if self._holes > len(self.position): self._compact()
+
+   def _compact(self):
+      """Closes up the holes left in _vertexAt by removed vertices, renumbering the positions.
+      Only done once the holes outnumber the vertices, so it costs O(1) amortised per removal."""
+      self._vertexAt = self.ordering()
+      self.position = { v: i for i, v in enumerate(self._vertexAt) }
+      self._holes = 0
+
+   def addEdge(self, u, v):
+      """Adds the edge (u,v), adding u and v as vertices if needed, and updates the ordering.
+      Returns None, or if the edge would make a cycle then returns that cycle as a list of vertices from v to u
+      (each with an edge to the next, closed by the new edge from u to v) and leaves the graph unchanged."""
+      self.addVertex(u)
+      self.addVertex(v)
+      if u == v: return [ u ]              # a loop is a cycle by itself
+
+      lower, upper = self.position[v], self.position[u]
+      if lower < upper:                    # v is before u, so the ordering must change
+         forward = self._search(v, self.out, lambda w: self.position[w] <= upper, u)
+         if isinstance(forward, list): return forward   # reached u from v: (u,v) would close a cycle
+         backward = self._search(u, self.into, lambda w: self.position[w] >= lower, None)
+         self._reorder(backward, forward)
+
+      self.out[u].add(v)
+      self.into[v].add(u)
+      return None
+
+   def removeEdge(self, u, v):
+      """Removes the edge (u,v) if it exists.  The ordering stays valid."""
+      if u in self.out: self.out[u].discard(v)
+      if v in self.into: self.into[v].discard(u)
+
+   def _search(self, start, adj, inRegion, target):
+      """Depth first search from start along adj, only visiting vertices w where inRegion(w).
+      If target is reached then returns the path from start to target as a list.  Otherwise returns the set of visited vertices."""
+      parents = { start: None }
+      stack = [ start ]
+      while stack:
+         x = stack.pop()
+         for w in adj[x]:
+            if w == target:
+               path = [ w, x ]
+               while (x := parents[x]) is not None:
+                  path.append(x)
+               path.reverse()
+               return path
+            if w not in parents and inRegion(w):
+               parents[w] = x
+               stack.append(w)
+      return set(parents)
+
+   def _reorder(self, backward, forward):
+      """Moves the vertices that reach u (backward) before the vertices reachable from v (forward),
+      reusing the positions the two sets already occupy, and keeping the order within each set."""
+      backward = sorted(backward, key=self.position.get)
+      forward = sorted(forward, key=self.position.get)
+      positions = sorted( self.position[w] for w in backward + forward )
+      for w, i in zip(backward + forward, positions):
+         self.position[w] = i
+         self._vertexAt[i] = w
+
+def findPath(V, E, start, end):
    """Given a (directed) graph (V,E), outputs a list of vertices forming a (directed) path from start to end.  If no such path exists, returns None.
 
-   Implemented using a simple DFS algorithm."""
-   # Take care of starting case so user doesn't have to supply the empty path
-   if path is None: path = [ start ]
-
-   # Base case:
-   if start == end: return path
-
-   # Search through neighbours.  Ignore vertices that are already on the path
-   # so we don't create a cycle.
-   for v in N_out(V, E, start):
-      if v in path:
-         continue
-      path.append(v)
-      # try to find end by going through v.  If we do, then we have found the path.
-      r = findPath(V, E, v, end, path)
-      if r is not None: return path
-      path.pop()
-
-   # If we haven't returned yet, then we can't find the end going this direction.
+   Implemented using a depth first search with an explicit stack, in O(|V| + |E|) time.  Each vertex is visited
+   at most once, since a vertex that didn't lead to end the first time won't the second time either."""
+   if start == end: return [ start ]
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   adj = outAdjacency(E)
+
+   parents = { start: None }               # vertices visited so far, and how we got there
+   stack = [ start ]
+   while stack:
+      u = stack.pop()
+      for v in adj.get(u, ()):
+         if v in V and v not in parents:
+            parents[v] = u
+            if v == end:
+               # follow the parents back to start
+               path = [ v ]
+               while (v := parents[v]) is not None:
+                  path.append(v)
+               path.reverse()
+               return path
+            stack.append(v)
+
+   # We have run out of vertices to search, so end can't be reached.
    return None
 
 def augmentingEdges(V, E, w, f):
@@ -131,33 +336,350 @@ def augmentFlow(path, f, w):
    return g
 
 def maxFlow(V, E, w, s, d):
-   """Given an anti-symmetric directed graph, edge weights w, a valid flow f, source vertex s and drain vertex d,
-   returns a maximum flow. """
-   f = { e: 0 for e in E }  # initial flow all 0
-
-   # augment along augmenting paths as long as we can
-   while (path := augmentingPath(V, E, w, f, s, d)) is not None:
-      f = augmentFlow(path, f, w)
-   return f
+   """Given an anti-symmetric directed graph, edge weights w, source vertex s and drain vertex d,
+   returns a maximum flow as a dictionary with keys E and values the flow along each edge.
+
+   Uses Dinic's algorithm, in O(|V|^2 |E|) time, and O(|E| sqrt(|V|)) when every weight is 1.
+   Each phase finds the distance from s to every vertex in the residual graph with a breadth first search,
+   then augments along shortest paths only (edges going one level further from s) until there are none left.
+   The residual graph is kept as arrays of arcs that are updated in place, rather than rebuilt for each path."""
+   E = list(E)
+
+   # Arc 2i is edge i of E and arc 2i+1 is its reverse, so arc a ^ 1 is always the reverse of arc a.
+   # head[u] is the list of arcs leaving u, to[a] is where arc a goes and cap[a] is its remaining capacity.
+   head = { v: [] for v in V }
+   to, cap = [], []
+   for (u, v) in E:
+      head.setdefault(u, []).append(len(to))
+      to.append(v)
+      cap.append(w[(u,v)])
+      head.setdefault(v, []).append(len(to))
+      to.append(u)
+      cap.append(0)
+
+   while True:
+      # Breadth first search for the level of each vertex, its distance from s in the residual graph
+      level = { s: 0 }
+      Dj = [ s ]
+      while Dj and d not in level:
+         Dnew = []
+         for u in Dj:
+            for a in head.get(u, ()):
+               if cap[a] > 0 and to[a] not in level:
+                  level[to[a]] = level[u] + 1
+                  Dnew.append(to[a])
+         Dj = Dnew
+      if d not in level: break             # no augmenting path left, so the flow is maximum
+
+      # Blocking flow: repeatedly find a path from s to d that goes up one level per arc and augment along it.
+      # nextArc[u] is the first arc of u not yet known to be useless this phase, so no arc is tried twice.
+      nextArc = { u: 0 for u in level }
+      path = []                            # arcs from s to u
+      u = s
+      while True:
+         if u == d:
+            a = min(cap[a] for a in path)  # capacity of the path
+            for b in path:
+               cap[b] -= a
+               cap[b ^ 1] += a
+            path = []
+            u = s
+            continue
+
+         arcs = head.get(u, ())
+         i = nextArc[u]
+         while i < len(arcs) and not (cap[arcs[i]] > 0 and level.get(to[arcs[i]]) == level[u] + 1):
+            i = i + 1
+         nextArc[u] = i
+
+         if i < len(arcs):
+            path.append(arcs[i])           # advance
+            u = to[arcs[i]]
+         elif u == s:
+            break                          # s is a dead end.  Phase over
+         else:
+            a = path.pop()                 # u is a dead end.  Retreat and skip the arc into u
+            u = to[a ^ 1]
+            nextArc[u] += 1
+
+   return { e: w[e] - cap[2 * i] for i, e in enumerate(E) }
+
+def _augmentingPathLayers(A, adj, mate):
+   """Breadth first search for the Hopcroft-Karp algorithm.  Starting from the unmatched vertices of A, alternately
+   follows an edge to B and the matching edge back to A, stopping at the first layer that reaches an unmatched
+   vertex of B.  Returns (dist, limit) where dist gives the layer of each vertex of A that was reached, and
+   limit is the layer whose vertices have edges to unmatched vertices, or None if there is no augmenting path."""
+   Dj = [ a for a in A if a not in mate ]
+   dist = { a: 0 for a in Dj }
+   limit = None
+   while Dj and limit is None:
+      Dnew = []
+      for a in Dj:
+         for b in adj[a]:
+            a2 = mate.get(b)
+            if a2 is None:
+               limit = dist[a]             # shortest augmenting paths end here
+            elif a2 not in dist:
+               dist[a2] = dist[a] + 1
+               Dnew.append(a2)
+      Dj = Dnew
+   return dist, limit
+
+def _augmentFrom(root, adj, mate, dist, limit):
+   """Depth first search for a shortest augmenting path from the unmatched vertex root of A through the layers
+   found by _augmentingPathLayers.  If one is found, swaps the matching along it and returns True.
+   Vertices found to be dead ends are removed from dist so that no later search in this phase visits them again."""
+   stack = [ (root, iter(adj[root])) ]     # vertices of A on the path, and the edges still to try from each
+   chosen = []                             # the vertex of B taken after each vertex of A on the path
+   while stack:
+      a, edges = stack[-1]
+      for b in edges:
+         a2 = mate.get(b)
+         if a2 is None and dist[a] == limit:
+            chosen.append(b)
+            for (x, _), y in zip(stack, chosen):   # every vertex of A on the path takes the next vertex of B
+               mate[x] = y
+               mate[y] = x
+            return True
+         if a2 is not None and dist.get(a2) == dist[a] + 1:
+            chosen.append(b)
+            stack.append( (a2, iter(adj[a2])) )
+            break
+      else:
+         del dist[a]                       # dead end for the rest of this phase
+         stack.pop()
+         if chosen: chosen.pop()
+   return False
+
+def _hopcroftKarp(A, adj, mate):
+   """Hopcroft-Karp algorithm.  Given the vertices A of one side of a bipartite graph, a dictionary adj with keys A and
+   values the neighbours of each vertex, and a matching mate as a dictionary from each matched vertex (on either side)
+   to its partner, grows mate in place into a maximum matching.  Each phase augments along a maximal set of disjoint
+   shortest augmenting paths, and O(sqrt(|V|)) phases are needed, so this takes O(|E| sqrt(|V|)) time."""
+   while True:
+      dist, limit = _augmentingPathLayers(A, adj, mate)
+      if limit is None: return mate        # no augmenting path, so the matching is maximum
+      for a in [ a for a in A if a not in mate ]:
+         if a in dist: _augmentFrom(a, adj, mate, dist, limit)
+
+def _bipartiteAdjacency(A, B, E):
+   """Returns a dictionary with keys A and values the set of vertices of B joined to each by an edge of E, in either direction."""
+   adj = { a: set() for a in A }
+   for (u, v) in E:
+      if u in adj and v in B: adj[u].add(v)
+      elif v in adj and u in B: adj[v].add(u)
+   return adj
 
 def maxMatching(A, B, E):
    """ Given a graph G = (A | B, E) with bipartition A, B find a maximum matching, returned as a set of edges.
-   G is undirected.
+   G is undirected, although E may list each edge in one direction only.
    The matching is returned as a set of undirected edges.
-   """
-
-   V = A | B
-   # find source and drain not already in V
-   s = max({ i for i in V if type(i) is int }, default=0) + 1
-   d = s + 1
 
-   # Define the flow problem
-   Vf = V | { s, d }
-   Ef = { (a,b) for (a, b) in E if a in A }                # direct all edges from A to B
-   Ef = Ef | { (s, v) for v in A } | { (v, d) for v in B } # add edges for source and drain
-   w = { e: 1 for e in Ef }                                # All edeges have weight 1
-   flow = maxFlow(Vf, Ef, w, s, d)
+   Uses the Hopcroft-Karp algorithm, in O(|E| sqrt(|V|)) time.
+   """
+   mate = _hopcroftKarp(A, _bipartiteAdjacency(A, B, E), dict())
+   matching = { (a, mate[a]) for a in A if a in mate }
+   return matching | { (b, a) for (a, b) in matching }
 
-   # extract the matching
-   matching = { (u,v) for u,v in Ef if u in A and flow[(u,v)] == 1 }
+def capacitatedMatching(A, B, E, capacity):
+   """Given a graph G = (A | B, E) with bipartition A, B and a capacity for each vertex of B, finds a largest set of
+   edges that uses each vertex of A at most once and each vertex b of B at most capacity[b] times (a b-matching).
+   capacity is either a dictionary from B to non-negative integers, with missing vertices having capacity 0, or
+   a single integer used for every vertex of B.  Returns a dictionary from each covered vertex of A to its vertex of B.
+
+   Solved as one maximum flow: a new source has an edge of weight 1 to each vertex of A, each edge of G goes from
+   A to B with weight 1, and each b in B has an edge of weight capacity[b] to a new drain.
+   Each vertex of A takes one unit, so Dinic's algorithm runs in O(|E| sqrt(|V|)) time as for a matching."""
+   if isinstance(capacity, int): capacity = { b: capacity for b in B }
+   adj = _bipartiteAdjacency(A, B, E)
+   s, d = object(), object()               # new vertices that can't clash with any in G
+
+   w = { (s, a): 1 for a in A }
+   w.update({ (a, b): 1 for a in A for b in adj[a] })
+   w.update({ (b, d): capacity.get(b, 0) for b in B })
+   f = maxFlow(set(A) | set(B) | { s, d }, w.keys(), w, s, d)
+   return { a: b for a in A for b in adj[a] if f[(a, b)] > 0 }
+
+class IncrementalMatching:
+   """A maximum matching of a bipartite graph G = (A | B, E) that is repaired, rather than recomputed, when G changes.
+
+   Removing vertices or edges can only unmatch the vertices they touched, and each added vertex or edge can
+   increase the size of a maximum matching by at most one, so after a change the previous matching is kept
+   and Hopcroft-Karp is run from it.  It stops after the few phases needed for the augmenting paths the change
+   created, instead of the O(sqrt(|V|)) phases needed from an empty matching.
+
+   An existing matching of G, such as one returned by maxMatching or an earlier run, can be given to start from.
+   It may be a set of edges in either or both directions, or a dictionary from vertices of A to vertices of B.
+   Raises ValueError if it is not a matching of G."""
+
+   def __init__(self, A, B, E, matching=()):
+      self.A, self.B = set(A), set(B)
+      self.adj = _bipartiteAdjacency(self.A, self.B, E)   # neighbours in B of each vertex of A
+      self.adjB = { b: set() for b in self.B }            # neighbours in A of each vertex of B
+      for a, Nb in self.adj.items():
+         for b in Nb:
+            self.adjB[b].add(a)
+
+      self.mate = dict()
+      for (u, v) in (matching.items() if isinstance(matching, dict) else matching):
+         a, b = (u, v) if u in self.A else (v, u)
+         if a not in self.adj or b not in self.adj[a]:
+            raise ValueError(f'{(u, v)} is not an edge of the graph.  Not a matching.')
+         if self.mate.get(a, b) != b or self.mate.get(b, a) != a:
+            raise ValueError(f'{(u, v)} shares a vertex with another edge.  Not a matching.')
+         self.mate[a], self.mate[b] = b, a
+      _hopcroftKarp(self.A, self.adj, self.mate)
+
+   def matching(self):
+      """Returns the current maximum matching as a set of undirected edges, as maxMatching does."""
+      matching = { (a, self.mate[a]) for a in self.A if a in self.mate }
+      return matching | { (b, a) for (a, b) in matching }
+
+   def update(self, addA=(), addB=(), addEdges=(), removeVertices=(), removeEdges=()):
+      """Changes the graph and repairs the matching, returning it as matching() does.
+      addA and addB are vertices to add to A and B, addEdges and removeEdges are edges (in either direction)
+      between A and B to add and remove, and removeVertices are vertices to remove with all their edges.
+      Removals are done before additions.  Edges that don't join a vertex of A to a vertex of B are ignored."""
+      for (u, v) in removeEdges:
+         a, b = (u, v) if u in self.A else (v, u)
+         if a in self.adj and b in self.adjB:
+            self.adj[a].discard(b)
+            self.adjB[b].discard(a)
+            if self.mate.get(a) == b: self._unmatch(a)
+
+      for v in removeVertices:
+         if v in self.mate: self._unmatch(v)
+         if v in self.A:
+            self.A.remove(v)
+            for b in self.adj.pop(v):
+               self.adjB[b].discard(v)
+         elif v in self.B:
+            self.B.remove(v)
+            for a in self.adjB.pop(v):
+               self.adj[a].discard(v)
+
+      for a in addA:
+         self.A.add(a)
+         self.adj.setdefault(a, set())
+      for b in addB:
+         self.B.add(b)
+         self.adjB.setdefault(b, set())
+      for (u, v) in addEdges:
+         a, b = (u, v) if u in self.A else (v, u)
+         if a in self.A and b in self.B:
+            self.adj[a].add(b)
+            self.adjB[b].add(a)
+
+      _hopcroftKarp(self.A, self.adj, self.mate)
+      return self.matching()
+
+   def _unmatch(self, v):
+      del self.mate[self.mate.pop(v)]
+
+def _hungarian(C):
+   """Hungarian algorithm for the n x m cost matrix C (a list of n rows), where n <= m and entries may be float('inf')
+   for pairs that can't be assigned.  Returns a list giving the column assigned to each row so that the total cost is
+   as small as possible, or None if every row can't be given a different column at finite cost.  Takes O(n^2 m) time.
+
+   Rows are added one at a time, each with a shortest augmenting path search that keeps row potentials u and column
+   potentials v such that C[i][j] - u[i] - v[j] >= 0, with equality along the assignment.  Indices are shifted by one
+   so that column 0 can stand for the row being added."""
+   n, m = len(C), len(C[0]) if C else 0
+   inf = float('inf')
+   u, v = [0] * (n + 1), [0] * (m + 1)
+   rowOf = [0] * (m + 1)                   # rowOf[j]: row assigned to column j, or 0
+   for i in range(1, n + 1):
+      rowOf[0] = i
+      j0 = 0
+      minReduced = [inf] * (m + 1)         # smallest reduced cost to reach each column so far
+      way = [0] * (m + 1)                  # previous column on that path
+      used = [False] * (m + 1)
+      while rowOf[j0] != 0:
+         used[j0] = True
+         i0, delta, j1 = rowOf[j0], inf, None
+         for j in range(1, m + 1):
+            if not used[j]:
+               reduced = C[i0 - 1][j - 1] - u[i0] - v[j]
+               if reduced < minReduced[j]: minReduced[j], way[j] = reduced, j0
+               if minReduced[j] < delta: delta, j1 = minReduced[j], j
+         if delta == inf: return None      # row i can't reach a free column
+         for j in range(m + 1):
+            if used[j]:
+               u[rowOf[j]] += delta
+               v[j] -= delta
+            else:
+               minReduced[j] -= delta
+         j0 = j1
+      while j0:                            # augment back along the path
+         j1 = way[j0]
+         rowOf[j0] = rowOf[j1]
+         j0 = j1
+
+   assignment = [ None ] * n
+   for j in range(1, m + 1):
+      if rowOf[j]: assignment[rowOf[j] - 1] = j - 1
+   return assignment
+
+def _hungarianNumpy(C):
+   """The same as _hungarian, but C is a NumPy array and the work over all columns at each step is vectorised."""
+   import numpy as np
+   n, m = C.shape
+   u, v = np.zeros(n + 1), np.zeros(m + 1)
+   rowOf = np.zeros(m + 1, dtype=int)
+   Cpadded = np.full((n + 1, m + 1), np.inf)
+   Cpadded[1:, 1:] = C
+   for i in range(1, n + 1):
+      rowOf[0] = i
+      j0 = 0
+      minReduced = np.full(m + 1, np.inf)
+      way = np.zeros(m + 1, dtype=int)
+      used = np.zeros(m + 1, dtype=bool)
+      while rowOf[j0] != 0:
+         used[j0] = True
+         i0 = rowOf[j0]
+         reduced = Cpadded[i0] - u[i0] - v
+         better = ~used & (reduced < minReduced)
+         minReduced[better] = reduced[better]
+         way[better] = j0
+         candidates = np.where(used, np.inf, minReduced)
+         j1 = int(np.argmin(candidates))
+         delta = candidates[j1]
+         if delta == np.inf: return None   # row i can't reach a free column
+         u[rowOf[used]] += delta
+         v[used] -= delta
+         minReduced[~used] -= delta
+         j0 = j1
+      while j0:                            # augment back along the path
+         j1 = way[j0]
+         rowOf[j0] = rowOf[j1]
+         j0 = j1
+
+   assignment = [ None ] * n
+   for j in range(1, m + 1):
+      if rowOf[j]: assignment[rowOf[j] - 1] = j - 1
+   return assignment
+
+def minCostMatching(A, B, E, cost, dense=None):
+   """Given a graph G = (A | B, E) with bipartition A, B and a function cost(a, b) giving the cost of each edge from a in A
+   to b in B, finds a matching that covers every vertex of A with the smallest total cost, returned as a set of
+   undirected edges like maxMatching.  Returns None if no matching covers all of A.
+
+   Uses the Hungarian algorithm on the |A| x |B| cost matrix, with pairs that have no edge costing infinity, in
+   O(|A|^2 |B|) time.  If dense is True, or dense is None and at least half of the possible edges are present, and
+   NumPy is installed, then the work over each row of the matrix is vectorised with NumPy."""
+   if len(A) > len(B): return None         # not enough vertices in B to go round
+   rows, columns = list(A), list(B)
+   adj = _bipartiteAdjacency(A, B, E)
+   C = [ [ cost(a, b) if b in adj[a] else float('inf') for b in columns ] for a in rows ]
+
+   if dense is None: dense = 2 * sum(len(Nb) for Nb in adj.values()) >= len(rows) * len(columns)
+   if dense and rows:
+      try:
+         import numpy as np
+      except ImportError:
+         dense = False                     # fall back to the pure Python version
+   assignment = _hungarianNumpy(np.array(C, dtype=float)) if dense and rows else _hungarian(C)
+
+   if assignment is None: return None
+   matching = { (a, columns[j]) for a, j in zip(rows, assignment) }
    return matching | { (b, a) for (a, b) in matching }
@@ -1,15 +1,84 @@
 # WARNING!  Do not edit this file!  The original graphs.py will be used when marking your code.
 
-def assertIsUndirectedGraph(V, E):
+import multiprocessing
+import os
+import random
+import time
+import weakref
+from collections.abc import MutableMapping
+from concurrent.futures import ProcessPoolExecutor
+
+from csrgraphs import CSRGraph
+
+# Set to True to skip the symmetry check in assertIsUndirectedGraph entirely,
+# e.g. in pipelines where every edge set is known to be undirected.
+trusted = False
+
+# Edge sets that have already passed assertIsUndirectedGraph.  Keys are id(E), values are
+# a weak reference to E and len(E) at the time of the check, so that a recycled id or a
+# set that has since grown or shrunk is checked again.
+_checkedEdgeSets = dict()
+
+class IndexedGraph(frozenset):
+   """An undirected edge set that also stores an adjacency dictionary, built once from a graph (V, E).
+
+   An IndexedGraph is a frozenset of edges, so it can be passed as E to any function in this module
+   and to code that expects a plain edge set.  Functions in this module detect it and answer
+   neighbourhood queries from the adjacency dictionary in O(deg(u)) time rather than scanning V.
+   csrgraphs.CSRGraph is handled the same way, for graphs too large to keep as sets.
+
+   G.V is the vertex set and G.adj is a dictionary with keys V and values the set of neighbours.
+   The edges are checked for symmetry once, on construction, unless trusted is True."""
+
+   def __new__(cls, V, E, trusted=False):
+      return super().__new__(cls, E)
+
+   def __init__(self, V, E, trusted=False):
+      self.V = frozenset(V)
+      self.adj = { v: set() for v in self.V }
+      for (u, v) in E:
+         self.adj.setdefault(u, set()).add(v)
+      if not trusted:
+         _assertSymmetric(self)
+
+   def __reduce__(self):
+      # for copy and pickle, e.g. sending a graph to a process pool.  The edges were already checked.
+      return (type(self), (self.V, frozenset(self), True))
+
+def _assertSymmetric(E):
    edgesSymmetric = all( (v, u) in E for (u,v) in E )
    if not edgesSymmetric:
       raise(ValueError('Edge set is not symmetric.  Not an undirected graph.'))
 
+def assertIsUndirectedGraph(V, E):
+   """Raises ValueError if the edge set E is not symmetric.
+
+   Each edge set is only checked once: an IndexedGraph is checked when it is built, a CSRGraph
+   records whether it is symmetric when it is built or loaded, and other edge sets are remembered
+   by identity (and size) after passing.  Edge sets that are modified in place without changing
+   size are not checked again.  Does nothing when trusted is True."""
+   if trusted or isinstance(E, IndexedGraph): return
+   if isinstance(E, CSRGraph):
+      if not E.isSymmetric():
+         raise(ValueError('Edge set is not symmetric.  Not an undirected graph.'))
+      return
+
+   checked = _checkedEdgeSets.get(id(E))
+   if checked is not None and checked[0]() is E and checked[1] == len(E): return
+
+   _assertSymmetric(E)
+   try:
+      _checkedEdgeSets[id(E)] = (weakref.ref(E, lambda r, key=id(E): _checkedEdgeSets.pop(key, None)), len(E))
+   except TypeError:
+      pass                                 # E can't be weakly referenced (e.g. a list), so it is not cached
+
 def N(V, E, u):
    """Returns the set of vertices in V that are adjacent to u given edges E.
 
    If (V,E) is the entire graph, returns the neighbourhood of vertex u."""
    assertIsUndirectedGraph(V, E)
+   if isinstance(E, (IndexedGraph, CSRGraph)):
+      return { v for v in E.adj.get(u, ()) if v in V }
    return { v for v in V if (u,v) in E }
 
 def NS(V, E, S):
@@ -17,6 +86,8 @@ def NS(V, E, S):
 
    If (V,E) is the entire graph, returns the neighbourhood of S."""
    assertIsUndirectedGraph(V, E)
+   if isinstance(E, (IndexedGraph, CSRGraph)):
+      return { v for u in S for v in E.adj.get(u, ()) if v in V }
    return { v for v in V for u in S if (u,v) in E }
 
 def degree(V, E, u):
@@ -24,28 +95,117 @@ def degree(V, E, u):
    assertIsUndirectedGraph(V, E)
    return len(N(V, E, u))
 
-def distanceClasses(V, E, u, D = None):
+def adjacency(E):
+   """Returns a dictionary with keys vertices and values the set of neighbours of that vertex given edges E.
+   Vertices with no edges are not included.  For an IndexedGraph or CSRGraph the stored adjacency is returned,
+   whose values are collections of neighbours that need not be sets."""
+   if isinstance(E, (IndexedGraph, CSRGraph)): return E.adj
+
+   adj = dict()
+   for (u, v) in E:
+      adj.setdefault(u, set()).add(v)
+   return adj
+
+def _bfsIter(V, adj, S):
+   """Breadth first search from the set of vertices S using the adjacency dictionary adj, only visiting vertices in the set V.
+   Yields (v, parent, depth) for each vertex v as it is reached, sources first with parent None and depth 0."""
+   seen = set(S)
+   frontier = list(seen)                     # D_0 = S
+   for u in frontier:
+      yield u, None, 0
+   depth = 0
+   while frontier:
+      depth = depth + 1
+      Dnew = []                              # D_{j} = N_{V_j}(D_{j-1})
+      for v in frontier:
+         for w in adj.get(v, ()):
+            if w in V and w not in seen:
+               seen.add(w)
+               Dnew.append(w)
+               yield w, v, depth
+      frontier = Dnew
+
+def _bfs(V, adj, S):
+   """Breadth first search from the set of vertices S using the adjacency dictionary adj, only visiting vertices in the set V.
+   Returns (D, dist, parents) as described in bfs, where every vertex of S has distance 0 and parent None."""
+   D = []
+   dist = dict()
+   parents = dict()
+   for v, parent, depth in _bfsIter(V, adj, S):
+      if depth == len(D): D.append(set())   # first vertex of a new distance class
+      D[depth].add(v)
+      dist[v] = depth
+      parents[v] = parent
+   return D, dist, parents
+
+def bfs(V, E, u):
+   """Breadth first search of the graph (V,E) starting from vertex u, in O(|V| + |E|) time.
+   Returns (D, dist, parents) where
+     D is the list of distance classes from u, as returned by distanceClasses,
+     dist is a dictionary with keys the vertices reachable from u and values their distance from u,
+     parents is a spanning tree of the vertices reachable from u, as returned by spanningTree."""
+   assertIsUndirectedGraph(V, E)
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   return _bfs(V, adjacency(E), {u})
+
+def distanceClasses(V, E, u):
    """Given a graph (V,E) and a starting vertex u, outputs a list of distances classes.
    That is, returns a partition of the vertices into sets of fixed distances from u, where u is in the distance class for distance 0.
-   Behaviour is undefined if the graph is disconnected."""
-   if D is None:                             # j = 0 case
-      assertIsUndirectedGraph(V, E)
-      D = [ {u} ]                            # D[0] = D_0 = {u}
-      return distanceClasses(V, E, None, D)  # recurse to get remaining distance classes
-
-   Vnew = V - D[-1]                          # V_{j} = V_{j-1} / D_{j-1}
-   Dnew = D + [ NS(Vnew, E, D[-1]) ]         # D_{j} = N_{V_j}(D_{j-1})
-   if len(Dnew[-1]) == 0: return D           # Didn't find any more vertices.  All done or G is disconnected.
-   return distanceClasses(Vnew, E, None, Dnew)
+   If the graph is disconnected then only the component containing u is partitioned."""
+   return bfs(V, E, u)[0]
 
 def distance(V, E, u, v):
    """Given two vertices u,v in the graph (V,E) return the length of the shortest path from u to v, or float('inf') if no path exists.
    float('inf') is used as it can be compared with other numbers and is >= any integer."""
-   D = distanceClasses(V, E, u)
-   for j, Dj in enumerate(D):
-      if v in Dj:
-         return j
-   return float('inf')
+   return bfs(V, E, u)[1].get(v, float('inf'))
+
+def distancesFrom(V, E, u):
+   """Given a vertex u in the graph (V,E) return a dictionary with keys the vertices reachable from u and values their distance from u.
+   This does one breadth first search, rather than one per vertex as calling distance for each vertex would.
+   Use dist.get(v, float('inf')) to treat unreachable vertices as being at distance infinity, like distance does."""
+   return bfs(V, E, u)[1]
+
+def distancesFromSet(V, E, S):
+   """Given a set of vertices S in the graph (V,E) return a dictionary with keys the vertices reachable from S
+   and values their distance from the nearest vertex in S, found with a single breadth first search."""
+   assertIsUndirectedGraph(V, E)
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   return _bfs(V, adjacency(E), S)[1]
+
+def allDistances(V, E):
+   """Given a graph (V,E) returns (M, index) giving the distance between every pair of vertices.
+   index is a dictionary with keys V and values 0, ..., |V|-1, and M is a |V| x |V| NumPy float32 array
+   where M[index[u], index[v]] is the distance from u to v, or inf if there is no path.
+
+   All |V| breadth first searches run at once: the frontiers are the rows of a boolean matrix that is
+   advanced one layer per step by multiplying it with the adjacency matrix.  Needs NumPy and about
+   13 * |V|^2 bytes of memory, so it is intended for graphs of up to a few thousand vertices."""
+   import numpy as np
+   assertIsUndirectedGraph(V, E)
+
+   index = { v: i for i, v in enumerate(V) }
+   n = len(index)
+   A = np.zeros((n, n), dtype=np.float32)              # adjacency matrix
+   edges = [ (index[u], index[v]) for (u, v) in E if u in index and v in index ]
+   if edges:
+      rows, cols = zip(*edges)
+      A[rows, cols] = 1
+
+   M = np.full((n, n), np.inf, dtype=np.float32)
+   np.fill_diagonal(M, 0)
+   visited = np.eye(n, dtype=bool)                     # visited[i, j]: j has been reached from i
+   frontier = np.eye(n, dtype=np.float32)              # frontier[i, j]: j is in the current distance class of i
+   active = np.arange(n)                               # sources whose frontier is not empty
+   j = 0
+   while len(active) > 0:
+      j = j + 1
+      reached = (frontier @ A > 0) & ~visited[active]  # D_j = N(D_{j-1}) - visited, for every source at once
+      M[active] = np.where(reached, j, M[active])
+      visited[active] |= reached
+      keep = reached.any(axis=1)
+      active = active[keep]
+      frontier = reached[keep].astype(np.float32)
+   return M, index
 
 def arbitrary(S):
    """Return an arbitrary element of the set S"""
@@ -53,29 +213,40 @@ def arbitrary(S):
       return next(iter(S))
    return None
 
+def _componentSearches(V, adj):
+   """Yields (D, dist, parents), as described in bfs, for a breadth first search of each connected component of
+   the graph with vertices V and adjacency dictionary adj in turn.  Takes O(|V| + |E|) time in total."""
+   Vleft = set(V)
+   while Vleft:
+      D, dist, parents = _bfs(Vleft, adj, { arbitrary(Vleft) })
+      Vleft -= dist.keys()                 # vertices of this component can't be reached again
+      yield D, dist, parents
+
+def components(V, E):
+   """Given a graph (V,E) returns its connected components as a list of vertex sets, in O(|V| + |E|) time."""
+   assertIsUndirectedGraph(V, E)
+   return [ set(dist) for D, dist, parents in _componentSearches(V, adjacency(E)) ]
+
 def connected(V, E):
    """Given a graph (V,E) return True if it is connected, otherwise False."""
-   v = arbitrary(V)
-   D = distanceClasses(V, E, v)
-   return V == set.union(*D)
+   return len(components(V, E)) <= 1
 
 def spanningTree(V, E, r):
    """Find a spanning tree in graph (V,E) rooted on r where all paths from vertex r to other vertices are shortest.
    If the graph is disconnected then the spanning tree only covers the component containing r.
 
-   The tree is returned as a dictionary where keys are vertices and values are the parent of that vertex in the spanning tree.  The root has parent None."""
-
-   D = distanceClasses(V, E, r)        #
-   Dpairs = zip(D[:-1], D[1:])         # iterator over pairs (D_j-1, D_j)
-
-   parents = {
-      v: arbitrary(N(Dprev, E, v))
-      for Dprev, Dj in Dpairs
-      for v in Dj
-   }
-   parents[r] = None
+   The tree is returned as a dictionary where keys are vertices and values are the parent of that vertex in the spanning tree.  The root has parent None.
+   Parents are recorded as the breadth first search reaches each vertex, in O(|V| + |E|) time."""
+   return { v: parent for v, parent, depth in iterSpanningTree(V, E, r) }
 
-   return parents
+def iterSpanningTree(V, E, r):
+   """Lazily builds the same shortest path spanning tree as spanningTree, in breadth first order.
+   Yields (v, parent, depth) for each vertex v reachable from r as it is reached, starting with (r, None, 0),
+   so callers that only need the vertices up to some depth can stop early.
+   The adjacency dictionary is built up front unless E is an IndexedGraph."""
+   assertIsUndirectedGraph(V, E)
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   return _bfsIter(V, adjacency(E), {r})
 
 def pathFromTree(parents, v):
    """Find a shortest path from the root to vertex v in a tree.
@@ -83,65 +254,318 @@ def pathFromTree(parents, v):
    The path is returned as a list of vertices starting from the root and ending at v (inclusive).
    If v is not in the tree then None is returned."""
    if v not in parents: return None        # vertex not in the tree, no path.
-   u = parents[v]
-   if u == None: return [v]                # at root? Stop
-   return pathFromTree(parents, u) + [v]   # go to parent, then to v
-
-def shortestPath(V, E, start, end, D=None):
+   path = [ v ]
+   while (v := parents[v]) is not None:    # go to parent until we reach the root
+      path.append(v)
+   path.reverse()                          # built from v back to the root
+   return path
+
+def shortestPaths(V, E, start, targets):
+   """Solve the shortest path problem in graph (V,E) from vertex start to each vertex in targets.
+   Returns a dictionary with keys targets and values the path from start as a list of vertices, or None if there is no path.
+   All paths come from one spanning tree, so this costs one breadth first search however many targets there are."""
+   parents = spanningTree(V, E, start)
+   return { v: pathFromTree(parents, v) for v in targets }
+
+def _bidirectionalPath(V, adj, start, end):
+   """Shortest path from start to end using adjacency dictionary adj, only visiting vertices in the set V.
+   Grows a breadth first search tree from each end, one whole layer at a time on the side with the smaller
+   frontier, and stops as soon as the trees meet.  Returns a list of vertices, or None if there is no path."""
+   trees = ( { start: None }, { end: None } )
+   frontiers = ( [ start ], [ end ] )
+   while frontiers[0] and frontiers[1]:
+      side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+      tree, otherTree = trees[side], trees[1 - side]
+      Dnew = []
+      for v in frontiers[side]:
+         for w in adj.get(v, ()):
+            if w in V and w not in tree:
+               tree[w] = v
+               if w in otherTree:
+                  # start -> w followed by w -> end, without repeating w
+                  return pathFromTree(trees[0], w) + pathFromTree(trees[1], w)[-2::-1]
+               Dnew.append(w)
+      frontiers = (Dnew, frontiers[1]) if side == 0 else (frontiers[0], Dnew)
+   return None                             # One side ran out of vertices.  No path.
+
+def shortestPath(V, E, start, end, bidirectional=False):
    """Solve the shortest path problem in graph (V,E) from vertex start to vertex end.
    Path is returned as a list of vertices.
-   If there is no such path then None is returned."""
-   if start is end: return [ start ]  # base case
+   If there is no such path then None is returned.
 
-   # Get the distance classes in the outer function call
-   if D is None:
-      D = distanceClasses(V, E, end)
+   If bidirectional is True then searches from both ends at once and stops when the searches meet,
+   which usually visits far fewer vertices.  Pass an IndexedGraph as E to also avoid building the
+   adjacency dictionary on every call."""
+   if start == end: return [ start ]  # base case
+   if not bidirectional:
+      if start not in V: return None
+      return pathFromTree(spanningTree(V, E, start), end)
 
-   j = next( (j for j, Dj in enumerate(D) if start in Dj), None)  # find start's distance class
-   if j is None: return None                                      # no path from start to end
-   v = arbitrary(N(V, E, start) & D[j - 1])                       # take one step towards end
-   return [ start ] + shortestPath(V, E, v, end, D)               # take remaining steps
+   assertIsUndirectedGraph(V, E)
+   if not isinstance(V, (set, frozenset)): V = set(V)
+   if start not in V or end not in V: return None
+   return _bidirectionalPath(V, adjacency(E), start, end)
 
 
 def isIndependentSet(U, E):
    """Returns True when there are no edges between any two vertices in U given edge set E"""
    assertIsUndirectedGraph(U, E)
+   if isinstance(E, (IndexedGraph, CSRGraph)):
+      return all( v not in U for u in U for v in E.adj.get(u, ()) )
    return all( (u,v) not in E for u in U for v in U )
 
+def _oddCycle(parents, u, w):
+   """Given a breadth first search tree parents and an edge (u,w) between two vertices at the same distance from the root,
+   returns the odd cycle made by the edge and the tree paths from u and w up to where they meet, as a list of vertices."""
+   pathU, pathW = [ u ], [ w ]
+   while pathU[-1] != pathW[-1]:           # u and w are at the same depth, so step both up together
+      pathU.append(parents[pathU[-1]])
+      pathW.append(parents[pathW[-1]])
+   return pathU + pathW[-2::-1]            # u up to the meeting vertex, then back down to w
+
+def bipartitionWitness(V, E):
+   """Decides whether the graph (V, E) is bipartite with a single breadth first search, in O(|V| + |E|) time.
+   Returns ((A, B), None) where (A, B) is a bipartition if the graph is bipartite.
+   Otherwise returns (None, cycle) where cycle is a list of an odd number of vertices, each adjacent to the next
+   and the last adjacent to the first, showing why no bipartition exists.  A loop gives a cycle of one vertex."""
+   assertIsUndirectedGraph(V, E)
+   adj = adjacency(E)
+   A, B = set(), set()
+
+   # Each component is bipartitioned separately.  There are no edges between components,
+   # so the union of their bipartitions is a bipartition.
+   # A,B get the even and odd distances from the component's starting vertex.
+   for D, dist, parents in _componentSearches(V, adj):
+      # An edge inside a distance class closes an odd cycle.  Edges of a BFS never skip a class.
+      edge = next( ((u, w) for u, j in dist.items() for w in adj.get(u, ()) if dist.get(w) == j), None )
+      if edge is not None:
+         return None, _oddCycle(parents, *edge)   # Not bipartite
+
+      A |= set.union( *D[0::2] )           # Slice starting at 0 to the end, step 2.  even indices
+      B |= set.union( *D[1::2], set() )    # Slice odd indices.  Set() argument deals with case of single vertex in V.
+
+   return (A, B), None
+
 def bipartition(V, E):
-   """If the graph (V, E) is bipartite then returns a pair (A,B) which is a bipartition.  Otherwise returns None."""
-   v = arbitrary(V)
-   if v is None: return set(), set()       # Empty vertex set, trivial bipartition.
+   """If the graph (V, E) is bipartite then returns a pair (A,B) which is a bipartition.  Otherwise returns None.
+   Use bipartitionWitness to also get an odd cycle when the graph is not bipartite."""
+   return bipartitionWitness(V, E)[0]
+
+class Colouring(MutableMapping):
+   """A graph colouring that also keeps its colour classes up to date.
+
+   Behaves as a dictionary with keys vertices and values colours, like the C returned by minColouring.
+   C.classes is a dictionary with keys colours and values the set of vertices with that colour, and is
+   updated in O(1) time whenever a vertex is coloured, recoloured or removed, so the partition never
+   needs to be rebuilt from scratch.  Building a Colouring from a dictionary takes O(|V|) time."""
 
-   # A,B will be even and odd distances from v
-   D = distanceClasses(V, E, v)
+   def __init__(self, C=()):
+      self._colours = dict()
+      self.classes = dict()
+      self.update(C)
 
-   # check that there are no edges within each distance class
-   if not all( isIndependentSet(Dj, E) for Dj in D ):
-      return None                          # Not bipartite
+   def __getitem__(self, v):
+      return self._colours[v]
 
-   A = set.union( *D[0::2] )               # Slice starting at 0 to the end, step 2.  even indices
-   B = set.union( *D[1::2], set() )        # Slice odd indices.  Set() argument deals with case of single vertex in V.
-   if A | B == V: return A, B              # Check whether we have found all vertices
+   def __setitem__(self, v, c):
+      if v in self._colours: del self[v]   # leave the old colour class
+      self._colours[v] = c
+      self.classes.setdefault(c, set()).add(v)
 
-   # There are some vertices left.  Partition them up and union the partitions.
-   r = bipartition(V - ( A | B), E)
-   if r is None: return None               # Not bipartite
-   A2, B2 = r
-   return A | A2, B | B2                   # The graph was disconnected, so no edges between A and A2 or between B and B2
+   def __delitem__(self, v):
+      c = self._colours.pop(v)
+      self.classes[c].discard(v)
+      if not self.classes[c]: del self.classes[c]   # no vertices left with colour c
+
+   def __iter__(self):
+      return iter(self._colours)
+
+   def __len__(self):
+      return len(self._colours)
+
+   def __repr__(self):
+      return f'Colouring({self._colours!r})'
+
+   def partition(self):
+      """Returns the colour classes as a list of sets, as colourClassesFromColouring does.
+      The sets are the ones kept in C.classes, so they change as C does and should not be modified."""
+      return list(self.classes.values())
 
 def colourClassesFromColouring(C):
    """Given a graph colouring in the form of a dictionary C with keys being vertices and values being colours,
    return a partition of the vertices where each set in the partition has the same colour.
+   Takes O(|V|) time, or O(k) time if C is a Colouring.
    """
+   if not isinstance(C, Colouring): C = Colouring(C)
+   return C.partition()
+
+def _inducedAdjacency(V, E):
+   """Returns a dictionary with keys V and values the set of neighbours of each vertex within V, ignoring loops."""
+   adj = adjacency(E)
+   Vset = V if isinstance(V, (set, frozenset)) else set(V)
+   return { v: { w for w in adj.get(v, ()) if w in Vset and w != v } for v in V }
+
+def _greedyClique(adj, starts=32):
+   """Returns a large clique, as a list, in the graph given by adjacency dictionary adj.
+   Grows a clique from each of the starts highest degree vertices, always adding the candidate
+   with the most neighbours among the remaining candidates, and returns the largest found."""
+   best = []
+   for v in sorted(adj, key=lambda v: len(adj[v]), reverse=True)[:starts]:
+      clique = [ v ]
+      candidates = set(adj[v])
+      while candidates:
+         u = max(candidates, key=lambda u: len(adj[u] & candidates))
+         clique.append(u)
+         candidates &= adj[u]
+      if len(clique) > len(best): best = clique
+   return best
+
+def _dsaturGreedy(adj):
+   """Colours the graph given by adjacency dictionary adj with the DSatur heuristic: repeatedly colour the vertex
+   with the most distinct colours among its neighbours (ties broken by degree) with the smallest colour it can take.
+   Returns (k, C) like minColouring, although k need not be the chromatic number."""
+   C = dict()
+   neighbourColours = { v: set() for v in adj }
+   while len(C) < len(adj):
+      v = max( (v for v in adj if v not in C), key=lambda v: (len(neighbourColours[v]), len(adj[v])) )
+      C[v] = next( c for c in range(len(adj)) if c not in neighbourColours[v] )
+      for w in adj[v]:
+         neighbourColours[w].add(C[v])
+   return max(C.values(), default=-1) + 1, C
+
+def _dsaturSearch(adj, C, kbest, Cbest, klower, sharedBound=None):
+   """Exact branch and bound colouring of the graph given by adjacency dictionary adj.
+
+   C is a partial colouring to extend, using colours 0, ..., k-1 for some k.  (kbest, Cbest) is the best known
+   colouring and klower a lower bound on the chromatic number, so the search stops as soon as kbest == klower.
+   At each step the uncoloured vertex with the most distinct neighbour colours (ties broken by degree) is coloured
+   with each colour already in use that it can take, or with one new colour.  Branches that would need kbest or more
+   colours are pruned.  Returns the best colouring found as (kbest, Cbest).
+
+   sharedBound is an optional multiprocessing.Value holding the best number of colours found by any process.
+   It is read regularly to tighten kbest and lowered whenever this search finds a better colouring.  Cbest is
+   only ever a colouring found by this search, so it may use more than kbest colours if another process did better.
+
+   The search keeps an explicit stack rather than recursing, so large graphs don't hit the recursion limit."""
+   C = dict(C)
+   uncoloured = { v for v in adj if v not in C }
+   counts = { v: dict() for v in adj }      # counts[v][c]: number of neighbours of v with colour c
+
+   def assign(v, c):
+      C[v] = c
+      uncoloured.discard(v)
+      for w in adj[v]:
+         counts[w][c] = counts[w].get(c, 0) + 1
+
+   def unassign(v):
+      c = C.pop(v)
+      uncoloured.add(v)
+      for w in adj[v]:
+         counts[w][c] -= 1
+         if counts[w][c] == 0: del counts[w][c]
+
+   for v, c in list(C.items()):
+      del C[v]
+      assign(v, c)
+
+   k = max(C.values(), default=-1) + 1
+   if not uncoloured:
+      return (k, dict(C)) if k < kbest else (kbest, Cbest)
+
+   def branch(k):
+      """Stack frame for the most saturated uncoloured vertex: [vertex, colours to try, next index, colours in use]."""
+      v = max(uncoloured, key=lambda v: (len(counts[v]), len(adj[v])))
+      return [ v, [ c for c in range(k + 1) if c not in counts[v] ], 0, k ]
+
+   stack = [ branch(k) ]
+   steps = 0
+   while stack and kbest > klower:
+      steps = steps + 1
+      if sharedBound is not None and steps % 1024 == 0:
+         kbest = min(kbest, sharedBound.value)   # another process may have found a better colouring
+         continue
+
+      frame = stack[-1]
+      v, colours, i, k = frame
+      if v in C: unassign(v)               # undo the previous colour tried for v
+
+      # Skip colours that would use kbest or more colours in total
+      while i < len(colours) and max(k, colours[i] + 1) >= kbest:
+         i = i + 1
+      if i == len(colours):
+         stack.pop()                       # tried everything for v, backtrack
+         continue
+      frame[2] = i + 1
+
+      c = colours[i]
+      assign(v, c)
+      if uncoloured:
+         stack.append(branch(max(k, c + 1)))
+      else:
+         kbest, Cbest = max(k, c + 1), dict(C)   # complete colouring, better than kbest since it wasn't pruned
+         if sharedBound is not None:
+            with sharedBound.get_lock():
+               sharedBound.value = min(sharedBound.value, kbest)
 
-   return [
-      { v for v, v_colour in C.items() if v_colour == colour }
-      for colour in set(C.values())
-   ]
+   return kbest, Cbest
 
+def _splitSearch(adj, C, kbest, Cbest, parts):
+   """Expands the search tree of _dsaturSearch breadth first from the partial colouring C, one vertex at a time,
+   until there are at least parts partial colourings left to search or the tree is exhausted.
+   Returns (kbest, Cbest, partials) where (kbest, Cbest) includes any complete colourings found on the way."""
+   partials = [ C ]
+   while partials and len(partials) < parts:
+      children = []
+      for C in partials:
+         k = max(C.values(), default=-1) + 1
+         uncoloured = [ v for v in adj if v not in C ]
+         if not uncoloured:
+            if k < kbest: kbest, Cbest = k, C
+            continue
+         badcolours = { v: { C[u] for u in adj[v] if u in C } for v in uncoloured }
+         v = max(uncoloured, key=lambda v: (len(badcolours[v]), len(adj[v])))
+         children += [ { **C, v: c } for c in range(k + 1) if c not in badcolours[v] and max(k, c + 1) < kbest ]
+      partials = children
+   return kbest, Cbest, [ C for C in partials if max(C.values(), default=-1) + 1 < kbest ]
+
+# State shared by every task in a worker process of _parallelSearch, set up by _initColouringWorker.
+_colouringWorker = dict()
+
+def _initColouringWorker(sharedBound, adj, klower):
+   _colouringWorker.update(sharedBound=sharedBound, adj=adj, klower=klower)
+
+def _colourSubtree(C):
+   """Runs _dsaturSearch from the partial colouring C in a worker process.
+   Returns a colouring better than the shared bound at the time it was found, or None."""
+   w = _colouringWorker
+   return _dsaturSearch(w['adj'], C, w['sharedBound'].value, None, w['klower'], w['sharedBound'])[1]
+
+def _parallelSearch(adj, C, kbest, Cbest, klower, workers):
+   """Like _dsaturSearch, but splits the search tree into several partial colourings that are searched in
+   a pool of worker processes.  The workers share the best number of colours found so far, so a good
+   colouring found by one worker prunes the searches of all the others."""
+   kbest, Cbest, partials = _splitSearch(adj, C, kbest, Cbest, 4 * workers)
+   if kbest <= klower or not partials: return kbest, Cbest
+
+   sharedBound = multiprocessing.Value('i', kbest)
+   with ProcessPoolExecutor(workers, initializer=_initColouringWorker, initargs=(sharedBound, adj, klower)) as pool:
+      for C in pool.map(_colourSubtree, partials):
+         if C is not None and max(C.values()) + 1 < kbest:
+            kbest, Cbest = max(C.values()) + 1, C
+   return kbest, Cbest
+
+def _colourComponent(adj, workers=1):
+   """Exact colouring of the graph given by adjacency dictionary adj, returned as (k, C) like minColouring."""
+   clique = _greedyClique(adj)
+   kbest, Cbest = _dsaturGreedy(adj)
+   if kbest == len(clique): return kbest, Cbest                  # greedy colouring is already optimal
+
+   C = { v: c for c, v in enumerate(clique) }
+   if workers > 1:
+      return _parallelSearch(adj, C, kbest, Cbest, len(clique), workers)
+   return _dsaturSearch(adj, C, kbest, Cbest, len(clique))
 
-def minColouring(V,E, k=None, C=None, kbest=None, Cbest=None):
+def minColouring(V, E, workers=1):
    """Given a graph (V,E) determines the chromatic number of the graph.
    Returns (k, C) where k is an integer giving the chromatic number and C is a dictionary with keys V
    and values in 0, ..., k-1 giving the colour for each vertex.
@@ -150,47 +574,100 @@ def minColouring(V,E, k=None, C=None, kbest=None, Cbest=None):
    which is a partition into k sets.  If the partition is desired then it can be
    obtained from the returned C with colourClassesFromColouring(C).
 
-   If the graph has a loop then no colouring exists. float('inf'), dict() returned. """
+   The search is seeded with a DSatur colouring as the initial best and a greedily found clique,
+   whose size is a lower bound on the chromatic number.  The clique is coloured first, and the
+   search stops as soon as it finds a colouring using as many colours as the clique has vertices.
+   Each connected component is coloured separately, reusing the same colours, since the chromatic
+   number is the largest chromatic number of a component.
 
-   # Set up variables for base case
-   if k is None:
-      assertIsUndirectedGraph(V, E)
-      if any((v, v) in E for v in V): return float('inf'), dict()    # found a loop.  No colourings.
-
-      C = { v: None for v in V }  # empty colouring
-      kbest = float('inf')        # no colouring found, initial best will be infinity
-      k = 1                       # start with only one colour
-
-   # Check if any vertices left to colour
-   if None not in C.values():
-      # Check to see if what we have is better than the previous best
-      if k < kbest:
-         return k, dict(C)        # make a copy since C is also held by our caller
-      return kbest, Cbest
-
-   # Choose a next vertex to colour
-   v = next( v for v in V if C[v] is None )
-   badcolours = { C[u] for u in N(V, E, v) } - { None }
-
-   if len(badcolours) >= kbest:
-      # already used up all colours and have more to colour. Can't improve, so return
-      return kbest, Cbest
-
-   if len(badcolours) >= k:
-      # used up all colours, add a new one
-      k = k + 1
-
-   # Try all possible colours
-   for c in range(k):
-      if c in badcolours: continue     # a neighbour has this colour, skip.
-      C[v] = c                         # Try to assign this colour
-      kret, Cret = minColouring(V, E, k, C, kbest, Cbest)   # Find the best colouring that extends C
-
-      # If we found a better colouring, keep it.
-      if kret < kbest:
-         kbest = kret
-         Cbest = Cret
-
-   # Undo what we did for the caller who shares C.
-   C[v] = None
-   return kbest, Cbest
+   If workers is more than 1 then the work is split across that many processes, or one per CPU if
+   workers is None: components are coloured in parallel if there are several, otherwise the search
+   tree is split.  The chromatic number is the same, but the colouring C may differ between runs.
+
+   If the graph has a loop then no colouring exists. float('inf'), dict() returned. """
+   assertIsUndirectedGraph(V, E)
+   if any((v, v) in E for v in V): return float('inf'), dict()    # found a loop.  No colourings.
+
+   adj = _inducedAdjacency(V, E)
+   componentAdjs = [ { v: adj[v] for v in dist } for D, dist, parents in _componentSearches(V, adj) ]
+   if workers is None: workers = os.cpu_count()
+
+   if workers > 1 and len(componentAdjs) > 1:
+      componentAdjs.sort(key=len, reverse=True)                  # start the biggest components first
+      with ProcessPoolExecutor(workers) as pool:
+         colourings = list(pool.map(_colourComponent, componentAdjs))
+   else:
+      colourings = [ _colourComponent(componentAdj, workers) for componentAdj in componentAdjs ]
+
+   C = { v: c for k, Ck in colourings for v, c in Ck.items() }
+   return max( (k for k, Ck in colourings), default=0 ), C
+
+def _greedyColouring(adj, order):
+   """Colours the vertices of the graph given by adjacency dictionary adj in the given order, each with the
+   smallest colour not used by its neighbours.  Returns (k, C) like minColouring."""
+   C = dict()
+   for v in order:
+      badcolours = { C[u] for u in adj[v] if u in C }
+      C[v] = next( c for c in range(len(badcolours) + 1) if c not in badcolours )
+   return max(C.values(), default=-1) + 1, C
+
+def _smallestLastOrder(adj):
+   """Returns the vertices of the graph given by adjacency dictionary adj in smallest-last order:
+   repeatedly remove a vertex of minimum degree in the remaining graph, then reverse the order of removal."""
+   degree = { v: len(adj[v]) for v in adj }
+   buckets = [ set() for _ in range(len(adj)) ]   # buckets[d]: remaining vertices with degree d
+   for v, d in degree.items():
+      buckets[d].add(v)
+
+   removed = []
+   d = 0
+   while len(removed) < len(adj):
+      d = max(d - 1, 0)                    # removing a vertex lowers degrees by at most one
+      while not buckets[d]: d = d + 1
+      v = buckets[d].pop()
+      removed.append(v)
+      degree[v] = None
+      for w in adj[v]:
+         if degree[w] is not None:
+            buckets[degree[w]].remove(w)
+            degree[w] = degree[w] - 1
+            buckets[degree[w]].add(w)
+   removed.reverse()
+   return removed
+
+def approxColouring(V, E, timeLimit=1.0, seed=None):
+   """Given a graph (V,E) quickly finds a colouring using few colours, but not necessarily the fewest.
+   Returns (k, C, klower) where (k, C) is as for minColouring and klower is a lower bound on the
+   chromatic number (the size of a clique), so k == klower means C is optimal.
+
+   Starts from the best of largest-first, smallest-last and DSatur greedy colourings, then improves it
+   with iterated greedy: recolour greedily taking the colour classes one after another, which never needs
+   more colours than before.  Stops after timeLimit seconds or when k reaches klower.
+   seed fixes the random choices, for repeatable results.
+
+   If the graph has a loop then no colouring exists. float('inf'), dict(), float('inf') returned."""
+   deadline = time.perf_counter() + timeLimit
+   assertIsUndirectedGraph(V, E)
+   if any((v, v) in E for v in V): return float('inf'), dict(), float('inf')   # found a loop.  No colourings.
+
+   adj = _inducedAdjacency(V, E)
+   klower = len(_greedyClique(adj))
+   kbest, Cbest = min(
+      _greedyColouring(adj, sorted(adj, key=lambda v: len(adj[v]), reverse=True)),   # largest first
+      _greedyColouring(adj, _smallestLastOrder(adj)),
+      _dsaturGreedy(adj),
+      key=lambda kC: kC[0]
+   )
+
+   rng = random.Random(seed)
+   k, C = kbest, Cbest
+   while k > klower and time.perf_counter() < deadline:
+      classes = colourClassesFromColouring(C)
+      strategy = rng.randrange(3)
+      if strategy == 0: classes.sort(key=len, reverse=True)  # largest class first
+      elif strategy == 1: classes.reverse()                   # reverse colour order
+      else: rng.shuffle(classes)                               # random order
+      k, C = _greedyColouring(adj, [ v for U in classes for v in U ])
+      if k < kbest: kbest, Cbest = k, C
+
+   return kbest, Cbest, klower
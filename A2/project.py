@@ -6,7 +6,7 @@ import csv
 
 from functools import reduce
 from collections import defaultdict
-from typing import Tuple
+from typing import Callable, Tuple
 
 
 def gamesOK(games: set) -> bool:
@@ -47,7 +47,10 @@ def gamesOK(games: set) -> bool:
 
 
 def referees(
-    games: set[Tuple[str, str]], refereecsvfilename: str
+    games: set[Tuple[str, str]],
+    refereecsvfilename: str,
+    cost: Callable[[Tuple[str, str], str], float] | None = None,
+    capacity: int | dict[str, int] | None = None,
 ) -> dict[Tuple[str, str], str] | None:
 
     with open(refereecsvfilename, newline="") as csv_file:
@@ -85,13 +88,43 @@ def referees(
         # find the maximum matching in the bipartite graph `G = (A | B, E)` such that each edge in E is
         # filtered so that any referee in B is not assigned more than one game from A
         # store the result in `M` as a dictionary such that each game `g` as edge `(p,o)` as the key is
-        # assigned a referee `r` as its value
-        M = {
-            g: r
-            for g, r in digraphs.maxMatching(set(A), B, E)
-            # if any value `g` is not a tuple of strings then the function is likely wrong anyway
-            if isinstance(g, tuple) and all(isinstance(p, str) for p in g)
-        }
+        # assigned a referee `r` as its value, or the cheapest such matching if a `cost(g, r)` is given
+        if capacity is None:
+            M = {
+                g: r
+                for g, r in (
+                    digraphs.maxMatching(set(A), B, E)
+                    if cost is None
+                    else digraphs.minCostMatching(set(A), B, E, cost) or set()
+                )
+                # if any value `g` is not a tuple of strings then the function is likely wrong anyway
+                if isinstance(g, tuple) and all(isinstance(p, str) for p in g)
+            }
+
+        # with a `capacity` (most games per referee, one number or a dictionary) use one maximum flow
+        elif cost is None:
+            M = digraphs.capacitatedMatching(set(A), B, E, capacity)
+
+        # with both, split each referee `r` into slots `(r, i)` of one game each and match games to slots
+        else:
+            slots = {
+                (r, i): r
+                for r in B
+                for i in range(capacity.get(r, 0) if isinstance(capacity, dict) else capacity)
+            }
+            M = {
+                g: slots[slot]
+                for g, slot in (
+                    digraphs.minCostMatching(
+                        set(A),
+                        set(slots),
+                        {(g, slot) for slot, r in slots.items() for g in A if (g, r) in E},
+                        lambda g, slot: cost(g, slots[slot]),
+                    )
+                    or set()
+                )
+                if slot in slots
+            }
 
         # if the size of `M` matches the size of the input and the game has a referee that is not a player,
         # then a referee was successfully assigned to each game and we return the valid output
@@ -104,7 +137,7 @@ def referees(
 
 
 def gameGroups(
-    assignedReferees: dict[Tuple[str, str], str]
+    assignedReferees: dict[Tuple[str, str], str], timeLimit: float | None = None
 ) -> list[set[Tuple[str, str]]] | None:
 
     # build a graph `G = (V, E)` where V is a list of the games and their assigned referees,
@@ -142,7 +175,14 @@ def gameGroups(
     #
     # fix the order of `assignedReferees` by converting to a list so that
     # iterators over keys in `assignedReferees` yield a deterministic output
-    k, C = graphs.minColouring(list(assignedReferees), E)
+    #
+    # if a `timeLimit` (in seconds) is given, use the approximate colouring instead so large tournaments
+    # are grouped within the time budget, at the cost of possibly using more groups than necessary
+    k, C = (
+        graphs.minColouring(list(assignedReferees), E)
+        if timeLimit is None
+        else graphs.approxColouring(list(assignedReferees), E, timeLimit)[:2]
+    )
 
     # create a partition list P where each vertex `u` (C.keys()) into a set of each vertex of the same color `C[u]` and
     # return P
@@ -150,7 +190,7 @@ def gameGroups(
     return P
 
 
-def gameSchedule(assignedReferees, gameGroups):
+def gameSchedule(assignedReferees, gameGroups, layered=False):
     # game - color mapping
     game_color = {g: c for c, group in enumerate(gameGroups) for g in group}
 
@@ -187,6 +227,23 @@ def gameSchedule(assignedReferees, gameGroups):
     E = { (b,a) for a in D for b in D[a] }
     V = set(D.keys()) | { c for ca in D for c in D[ca] }
 
+    # with `layered`, return a list of slots where each slot is a list of game groups that have no
+    # dependencies on each other and can be played at the same time, e.g. at different venues
+    #
+    # the layers are taken over every group, so groups without dependencies still get a slot, with an
+    # edge from the group of each game a referee plays in to the group of the game they referee
+    if layered:
+        top_layers = digraphs.topLayers(
+            set(range(len(gameGroups))),
+            {
+                (game_color[gp], game_color[gr])
+                for gr, r in assignedReferees.items()
+                for gp in assignedReferees
+                if r in gp and game_color[gp] != game_color[gr]
+            },
+        )
+        return None if top_layers is None else [ [ gameGroups[color] for color in layer ] for layer in top_layers ]
+
     top_ordering = digraphs.topOrdering(V,E)
 
     # rearrange `gameGroups` such that the color in top_ordering
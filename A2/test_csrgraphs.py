@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+import os
+import tempfile
+import unittest
+from array import array
+import csrgraphs
+import graphs
+from csrgraphs import CSRGraph
+
+
+class TestCSRGraph(unittest.TestCase):
+   def setUp(self):
+      self.V = { 'a', 'b', 'c', 'd' }
+      self.E = { ('a', 'b'), ('b', 'a'), ('b', 'c'), ('c', 'b') }
+      directory = tempfile.TemporaryDirectory()
+      self.addCleanup(directory.cleanup)
+      self.filename = os.path.join(directory.name, 'graph.csr')
+
+
+   def test_edge_set(self):
+      G = CSRGraph.fromGraph(self.V, self.E)
+      self.assertEqual(set(G), self.E)
+      self.assertEqual(len(G), len(self.E))
+      self.assertIn(('a', 'b'), G)
+      self.assertNotIn(('a', 'c'), G)
+      self.assertNotIn(('a', 'z'), G)
+      self.assertEqual(G.toGraph(), (self.V, self.E))
+      self.assertEqual(graphs.N(self.V, G, 'b'), { 'a', 'c' })
+
+
+   def test_save_load(self):
+      G = CSRGraph.fromGraph(self.V, self.E)
+      csrgraphs.save(G, self.filename)
+      H = csrgraphs.load(self.filename)
+      self.assertEqual(H.vertices, G.vertices)
+      self.assertEqual(list(H.offsets), list(G.offsets))
+      self.assertEqual(list(H.neighbours), list(G.neighbours))
+      self.assertEqual(set(H), self.E)
+      self.assertEqual(graphs.components(self.V, H), graphs.components(self.V, self.E))
+
+
+   def test_save_load_other_integer_types(self):
+      G = CSRGraph.fromGraph(self.V, self.E)
+      for offsets, neighbours in [ (array('i', G.offsets), array('i', G.neighbours)),
+                                   (list(G.offsets), list(G.neighbours)) ]:
+         csrgraphs.save(CSRGraph(G.vertices, offsets, neighbours), self.filename)
+         self.assertEqual(set(csrgraphs.load(self.filename)), self.E)
+
+
+   def test_symmetric(self):
+      G = CSRGraph.fromGraph(self.V, self.E)
+      self.assertTrue(G.symmetric)
+      csrgraphs.save(G, self.filename)
+      self.assertTrue(csrgraphs.load(self.filename).symmetric)
+
+      D = CSRGraph.fromGraph(self.V, { ('a', 'b'), ('b', 'c'), ('c', 'b') })
+      self.assertFalse(D.symmetric)
+      csrgraphs.save(D, self.filename)
+      D = csrgraphs.load(self.filename)
+      self.assertFalse(D.symmetric)
+      with self.assertRaises(ValueError):
+         graphs.N(self.V, D, 'a')
+
+
+   def test_symmetric_unknown(self):
+      G = CSRGraph.fromGraph(self.V, self.E)
+      H = CSRGraph(G.vertices, G.offsets, G.neighbours)
+      self.assertIsNone(H.symmetric)
+      self.assertEqual(graphs.N(self.V, H, 'b'), { 'a', 'c' })
+      self.assertTrue(H.symmetric)
+
+
+   def test_load_bad_file(self):
+      with open(self.filename, 'wb') as f:
+         f.write(bytes(64))
+      with self.assertRaises(ValueError):
+         csrgraphs.load(self.filename)
+
+      # a saved file cut short, or with extra bytes on the end
+      csrgraphs.save(CSRGraph.fromGraph(self.V, self.E), self.filename)
+      with open(self.filename, 'rb') as f:
+         contents = f.read()
+      for length in (len(contents) - 8, len(contents) - 4, 20, 8):
+         with open(self.filename, 'wb') as f:
+            f.write(contents[:length])
+         with self.assertRaises(ValueError):
+            csrgraphs.load(self.filename)
+      with open(self.filename, 'wb') as f:
+         f.write(contents + bytes(8))      # longer than the header says
+      with self.assertRaises(ValueError):
+         csrgraphs.load(self.filename)
+
+
+if __name__ == '__main__':
+   unittest.main()
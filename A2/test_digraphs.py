@@ -0,0 +1,433 @@
+#!/usr/bin/env python
+
+import itertools
+import random
+import unittest
+import digraphs as D
+
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+def randomDigraph(n, p, seed):
+   """Returns a random anti-symmetric directed graph on 0, ..., n-1."""
+   rng = random.Random(seed)
+   E = set()
+   for u, v in itertools.combinations(range(n), 2):
+      if rng.random() < p: E.add((u, v) if rng.random() < 0.5 else (v, u))
+   return set(range(n)), E
+
+def isCycle(E, cycle):
+   return len(cycle) > 0 and all( (cycle[i], cycle[(i + 1) % len(cycle)]) in E for i in range(len(cycle)) )
+
+def randomDAG(n, p, seed):
+   """Returns a random directed acyclic graph on 0, ..., n-1, with the vertices numbered in a shuffled order."""
+   rng = random.Random(seed)
+   label = list(range(n))
+   rng.shuffle(label)
+   return set(range(n)), { (label[u], label[v]) for u, v in itertools.combinations(range(n), 2) if rng.random() < p }
+
+def randomBipartite(na, nb, p, seed):
+   """Returns a random bipartite graph (A, B, E), with each edge listed in a random direction."""
+   rng = random.Random(seed)
+   A, B = { ('a', i) for i in range(na) }, { ('b', i) for i in range(nb) }
+   E = { (a, b) if rng.random() < 0.5 else (b, a) for a in sorted(A) for b in sorted(B) if rng.random() < p }
+   return A, B, E
+
+def maxMatchingSize(A, E):
+   """Brute force size of a maximum matching, for checking maxMatching on small graphs."""
+   A = sorted(A)
+   def best(i, used):
+      if i == len(A): return 0
+      options = [ best(i + 1, used) ]
+      for (u, v) in E:
+         b = v if u == A[i] else u if v == A[i] else None
+         if b is not None and b not in used: options.append(1 + best(i + 1, used | { b }))
+      return max(options)
+   return best(0, frozenset())
+
+def minMatchingCost(A, B, E, cost):
+   """Brute force smallest total cost of a matching covering A, or None if there is none."""
+   A = sorted(A)
+   costs = [ sum( cost(a, b) for a, b in zip(A, Bs) )
+             for Bs in itertools.permutations(sorted(B), len(A))
+             if all( (a, b) in E or (b, a) in E for a, b in zip(A, Bs) ) ]
+   return min(costs, default=None)
+
+def capacitatedMatchingSize(A, E, capacity):
+   """Brute force size of a largest capacitated matching, for checking capacitatedMatching on small graphs."""
+   neighbours = { a: [ v for (u, v) in E if u == a ] + [ u for (u, v) in E if v == a ] for a in A }
+   options = [ [ None ] + neighbours[a] for a in sorted(A) ]
+   best = 0
+   for choice in itertools.product(*options):
+      chosen = [ b for b in choice if b is not None ]
+      if all( chosen.count(b) <= capacity.get(b, 0) for b in chosen ): best = max(best, len(chosen))
+   return best
+
+def minCut(V, E, w, s, d):
+   """Brute force capacity of a minimum cut separating s from d, for checking maxFlow on small graphs."""
+   others = [ v for v in V if v != s and v != d ]
+   cuts = []
+   for k in range(len(others) + 1):
+      for T in itertools.combinations(others, k):
+         S = set(T) | { s }
+         cuts.append(sum( w[(u, v)] for (u, v) in E if u in S and v not in S ))
+   return min(cuts)
+
+
+class TestMaxFlow(unittest.TestCase):
+   def checkFlow(self, V, E, w, s, d, f):
+      self.assertEqual(set(f), set(E))
+      self.assertTrue(all( 0 <= f[e] <= w[e] for e in E ))
+      for v in V - { s, d }:
+         self.assertEqual(sum( f[(u, x)] for (u, x) in E if x == v ), sum( f[(x, u)] for (x, u) in E if x == v ))
+      return sum( f[(u, v)] for (u, v) in E if u == s ) - sum( f[(u, v)] for (u, v) in E if v == s )
+
+
+   def test_small(self):
+      # two paths from s to d, sharing the edge (1,3) which limits them to 3 in total
+      V = { 's', 1, 2, 3, 'd' }
+      w = { ('s', 1): 4, ('s', 2): 5, (1, 3): 3, (2, 3): 2, (3, 'd'): 10, (2, 'd'): 1 }
+      f = D.maxFlow(V, w.keys(), w, 's', 'd')
+      self.assertEqual(self.checkFlow(V, set(w), w, 's', 'd', f), 6)
+
+
+   def test_no_path(self):
+      V = { 0, 1, 2 }
+      w = { (0, 1): 3, (2, 1): 4 }
+      f = D.maxFlow(V, w.keys(), w, 0, 2)
+      self.assertEqual(f, { (0, 1): 0, (2, 1): 0 })
+
+
+   def test_min_cut(self):
+      for seed in range(40):
+         V, E = randomDigraph(7, 0.6, seed)
+         rng = random.Random(seed)
+         w = { e: rng.randint(1, 9) for e in E }
+         f = D.maxFlow(V, E, w, 0, 6)
+         self.assertEqual(self.checkFlow(V, E, w, 0, 6, f), minCut(V, E, w, 0, 6))
+
+
+class TestTopOrdering(unittest.TestCase):
+   def test_dag(self):
+      for seed in range(20):
+         V, E = randomDAG(12, 0.3, seed)
+         ordering, cycle = D.topOrderingWitness(V, E)
+         self.assertIsNone(cycle)
+         self.assertEqual(sorted(ordering), sorted(V))
+         position = { v: i for i, v in enumerate(ordering) }
+         self.assertTrue(all( position[u] < position[v] for (u, v) in E ))
+         self.assertEqual(D.topOrdering(V, E), ordering)
+
+
+   def test_layers(self):
+      V = { 'a', 'b', 'c', 'd', 'e' }
+      E = { ('a', 'c'), ('b', 'c'), ('c', 'd'), ('a', 'd') }
+      self.assertEqual(D.topLayers(V, E), [ { 'a', 'b', 'e' }, { 'c' }, { 'd' } ])
+
+
+   def test_cycle(self):
+      for seed in range(20):
+         V, E = randomDAG(12, 0.3, seed)
+         # the vertex v furthest from some vertex u, so the edge (v,u) closes a long cycle
+         u = max(V, key=lambda u: max(D.bfs(V, E, u)[1].values()))
+         dist = D.bfs(V, E, u)[1]
+         v = max(dist, key=dist.get)
+         self.assertGreater(dist[v], 1)
+         E = E | { (v, u) }
+         for witness in (D.topOrderingWitness, D.topLayersWitness):
+            result, cycle = witness(V, E)
+            self.assertIsNone(result)
+            self.assertTrue(isCycle(E, cycle))
+         self.assertIsNone(D.topOrdering(V, E))
+         self.assertIsNone(D.topLayers(V, E))
+
+
+   def test_loop(self):
+      self.assertEqual(D.topOrderingWitness({ 0, 1 }, { (0, 1), (1, 1) }), (None, [ 1 ]))
+
+
+   def test_empty(self):
+      self.assertEqual(D.topOrdering(set(), set()), [])
+      self.assertEqual(D.topLayers(set(), set()), [])
+
+
+class TestFindPath(unittest.TestCase):
+   def test_reachability(self):
+      for seed in range(20):
+         V, E = randomDigraph(10, 0.3, seed)
+         reachable = D.bfs(V, E, 0)[1]
+         for end in V:
+            path = D.findPath(V, E, 0, end)
+            if end not in reachable:
+               self.assertIsNone(path)
+            else:
+               self.assertEqual((path[0], path[-1]), (0, end))
+               self.assertEqual(len(set(path)), len(path))
+               self.assertTrue(all( (u, v) in E for u, v in zip(path, path[1:]) ))
+
+
+   def test_only_uses_V(self):
+      E = { (0, 1), (1, 2), (0, 3), (3, 4), (4, 2) }
+      self.assertEqual(D.findPath({ 0, 2, 3, 4 }, E, 0, 2), [ 0, 3, 4, 2 ])
+      self.assertIsNone(D.findPath({ 0, 2 }, E, 0, 2))
+
+
+   def test_long_path(self):
+      n = 20000                            # far deeper than the recursion limit
+      E = { (i, i + 1) for i in range(n) }
+      self.assertEqual(D.findPath(set(range(n + 1)), E, 0, n), list(range(n + 1)))
+      self.assertIsNone(D.findPath(set(range(n + 1)), E, n, 0))
+      self.assertEqual(D.findPath(set(range(n + 1)), E, 5, 5), [ 5 ])
+
+
+class TestMaxMatching(unittest.TestCase):
+   def checkMatching(self, A, B, E, M):
+      self.assertEqual(M, { (v, u) for (u, v) in M })   # symmetric
+      half = { (a, b) for (a, b) in M if a in A }
+      self.assertTrue(all( b in B and ((a, b) in E or (b, a) in E) for (a, b) in half ))
+      self.assertEqual(len({ b for (a, b) in half }), len(half))
+      self.assertEqual(len({ a for (a, b) in half }), len(half))
+      return len(half)
+
+
+   def test_brute_force(self):
+      for seed in range(40):
+         A, B, E = randomBipartite(6, 5, 0.4, seed)
+         self.assertEqual(self.checkMatching(A, B, E, D.maxMatching(A, B, E)), maxMatchingSize(A, E))
+
+
+   def test_augmenting_path(self):
+      # the greedy choice (a0,b0) has to be undone to match everything
+      A, B = { 'a0', 'a1' }, { 'b0', 'b1' }
+      E = { ('a0', 'b0'), ('a0', 'b1'), ('a1', 'b0') }
+      self.assertEqual(D.maxMatching(A, B, E), { ('a0', 'b1'), ('b1', 'a0'), ('a1', 'b0'), ('b0', 'a1') })
+
+
+   def test_empty(self):
+      self.assertEqual(D.maxMatching({ 'a' }, { 'b' }, set()), set())
+      self.assertEqual(D.maxMatching(set(), set(), set()), set())
+
+
+class TestIncrementalMatching(unittest.TestCase):
+   def test_random_updates(self):
+      rng = random.Random(0)
+      A, B, E = randomBipartite(8, 8, 0.3, 0)
+      E = { (a, b) if a in A else (b, a) for (a, b) in E }
+      matching = D.IncrementalMatching(A, B, E)
+      nextVertex = 100
+      for step in range(100):
+         addA, addB, addEdges, removeVertices, removeEdges = set(), set(), set(), set(), set()
+         change = rng.randrange(4)
+         if change == 0 and E:
+            removeEdges = set(rng.sample(sorted(E), min(3, len(E))))
+         elif change == 1 and A and B:
+            removeVertices = { rng.choice(sorted(A)), rng.choice(sorted(B)) }
+         elif change == 2:
+            addA, addB = { ('a', nextVertex) }, { ('b', nextVertex) }
+            nextVertex += 1
+         if A | addA and B | addB:
+            addEdges = { (rng.choice(sorted(A | addA)), rng.choice(sorted(B | addB))) for i in range(3) }
+            addEdges = { (b, a) if rng.random() < 0.5 else (a, b) for (a, b) in addEdges }
+
+         M = matching.update(addA, addB, addEdges, removeVertices, removeEdges)
+
+         # apply the same change to the graph, removals first
+         E -= removeEdges
+         E = { (a, b) for (a, b) in E if a not in removeVertices and b not in removeVertices }
+         A, B = (A - removeVertices) | addA, (B - removeVertices) | addB
+         E |= { (a, b) if a in A else (b, a) for (a, b) in addEdges }
+
+         half = { (a, b) for (a, b) in M if a in A }
+         self.assertEqual(M, half | { (b, a) for (a, b) in half })
+         self.assertTrue(half <= E)
+         self.assertEqual(len({ b for (a, b) in half }), len(half))
+         self.assertEqual(len(half), len(D.maxMatching(A, B, E)) // 2)
+
+
+   def test_remove_matched_edge(self):
+      matching = D.IncrementalMatching({ 'a0', 'a1' }, { 'b0', 'b1' }, { ('a0', 'b0'), ('a1', 'b1'), ('a0', 'b1') })
+      self.assertEqual(len(matching.matching()), 4)
+      M = matching.update(removeEdges={ ('b1', 'a1') })
+      self.assertEqual(len(M), 2)
+      self.assertTrue(M <= { ('a0', 'b0'), ('b0', 'a0'), ('a0', 'b1'), ('b1', 'a0') })
+      M = matching.update(addEdges={ ('a1', 'b0') })
+      self.assertEqual(M, { ('a0', 'b1'), ('b1', 'a0'), ('a1', 'b0'), ('b0', 'a1') })
+
+
+   def test_existing_matching(self):
+      A, B, E = randomBipartite(8, 8, 0.3, 1)
+      M = D.maxMatching(A, B, E)
+      self.assertEqual(D.IncrementalMatching(A, B, E, M).matching(), M)   # already maximum, so kept
+      half = { (a, b) for (a, b) in M if a in A }
+      self.assertEqual(D.IncrementalMatching(A, B, E, dict(half)).matching(), M)
+      self.assertEqual(D.IncrementalMatching(A, B, E, { (b, a) for (a, b) in half }).matching(), M)
+
+      # a smaller matching is grown into a maximum one, then repaired after a change
+      partial = set(sorted(half)[:2])
+      matching = D.IncrementalMatching(A, B, E, partial)
+      self.assertEqual(len(matching.matching()), len(M))
+      a, b = sorted(half)[0]
+      self.assertEqual(len(matching.update(removeVertices={ a })), len(D.maxMatching(A - { a }, B, E)))
+
+
+   def test_existing_matching_not_valid(self):
+      A, B = { 'a0', 'a1' }, { 'b0', 'b1' }
+      E = { ('a0', 'b0'), ('a1', 'b0'), ('a1', 'b1') }
+      with self.assertRaises(ValueError):
+         D.IncrementalMatching(A, B, E, { ('a0', 'b1') })                  # not an edge
+      with self.assertRaises(ValueError):
+         D.IncrementalMatching(A, B, E, { ('a0', 'b0'), ('a1', 'b0') })    # b0 used twice
+
+
+class TestDynamicTopOrdering(unittest.TestCase):
+   def checkOrdering(self, V, E, ordering):
+      self.assertEqual(sorted(ordering), sorted(V))
+      position = { v: i for i, v in enumerate(ordering) }
+      self.assertTrue(all( position[u] < position[v] for (u, v) in E ))
+
+
+   def test_random_changes(self):
+      rng = random.Random(0)
+      V, E = randomDAG(10, 0.2, 0)
+      T = D.DynamicTopOrdering(V, E)
+      self.checkOrdering(V, E, T.ordering())
+      for step in range(300):
+         change = rng.randrange(10)
+         if change < 6:
+            u, v = rng.randrange(15), rng.randrange(15)
+            path = D.findPath(V | { u, v }, E, v, u)
+            cycle = T.addEdge(u, v)
+            V |= { u, v }
+            if path is None:
+               self.assertIsNone(cycle)
+               E.add((u, v))
+            else:
+               self.assertEqual((cycle[0], cycle[-1]), (v, u))
+               self.assertTrue(isCycle(E | { (u, v) }, cycle))
+         elif change < 8 and E:
+            u, v = rng.choice(sorted(E))
+            T.removeEdge(u, v)
+            E.discard((u, v))
+         else:
+            v = rng.randrange(15)
+            T.removeVertex(v)
+            V.discard(v)
+            E = { (a, b) for (a, b) in E if v not in (a, b) }
+         self.checkOrdering(V, E, T.ordering())
+
+
+   def test_cycle_on_construction(self):
+      with self.assertRaises(ValueError):
+         D.DynamicTopOrdering({ 0, 1, 2 }, { (0, 1), (1, 2), (2, 0) })
+
+
+   def test_remove_unknown_vertex(self):
+      T = D.DynamicTopOrdering({ 0, 1 }, { (0, 1) })
+      T.removeVertex(5)
+      T.removeEdge(5, 0)
+      self.assertEqual(T.ordering(), [ 0, 1 ])
+
+
+   def test_removed_vertices_release_space(self):
+      T = D.DynamicTopOrdering({ 'root' })
+      for i in range(1000):
+         T.addEdge('root', i)
+         T.removeVertex(i)
+      self.assertEqual(T.ordering(), [ 'root' ])
+      self.assertLessEqual(len(T._vertexAt), 3)
+      T.addEdge(0, 'root')
+      self.assertEqual(T.ordering(), [ 0, 'root' ])
+
+
+class TestMinCostMatching(unittest.TestCase):
+   def checkMatching(self, A, B, E, M):
+      self.assertEqual(M, { (v, u) for (u, v) in M })
+      half = { (a, b) for (a, b) in M if a in A }
+      self.assertEqual({ a for (a, b) in half }, A)
+      self.assertEqual(len({ b for (a, b) in half }), len(half))
+      self.assertTrue(all( b in B and ((a, b) in E or (b, a) in E) for (a, b) in half ))
+      return half
+
+
+   def test_brute_force(self):
+      denses = (False, True) if numpy is not None else (False,)
+      for seed in range(60):
+         rng = random.Random(seed)
+         A, B, E = randomBipartite(rng.randint(0, 5), rng.randint(0, 6), 0.6, seed)
+         w = { (a, b): rng.randint(0, 20) for a in A for b in B }
+         cost = lambda a, b: w[(a, b)]
+         best = minMatchingCost(A, B, E, cost)
+         for dense in denses:
+            M = D.minCostMatching(A, B, E, cost, dense)
+            if best is None:
+               self.assertIsNone(M)
+            else:
+               self.assertEqual(sum( cost(a, b) for (a, b) in self.checkMatching(A, B, E, M) ), best)
+
+
+   def test_infeasible(self):
+      # a1 and a2 can only use b0
+      A, B = { 'a0', 'a1', 'a2' }, { 'b0', 'b1', 'b2' }
+      E = { ('a0', 'b1'), ('a1', 'b0'), ('a2', 'b0'), ('a0', 'b2') }
+      for dense in (False, True) if numpy is not None else (False,):
+         self.assertIsNone(D.minCostMatching(A, B, E, lambda a, b: 1, dense))
+
+
+   def test_more_in_A_than_B(self):
+      A, B = { 'a0', 'a1' }, { 'b0' }
+      E = { ('a0', 'b0'), ('a1', 'b0') }
+      self.assertIsNone(D.minCostMatching(A, B, E, lambda a, b: 1))
+
+
+   def test_cheapest(self):
+      A, B = { 'a0', 'a1' }, { 'b0', 'b1' }
+      E = { (a, b) for a in A for b in B }
+      w = { ('a0', 'b0'): 1, ('a0', 'b1'): 2, ('a1', 'b0'): 1, ('a1', 'b1'): 5 }
+      M = D.minCostMatching(A, B, E, lambda a, b: w[(a, b)])
+      self.assertEqual(self.checkMatching(A, B, E, M), { ('a0', 'b1'), ('a1', 'b0') })
+
+
+class TestCapacitatedMatching(unittest.TestCase):
+   def checkMatching(self, A, B, E, capacity, M):
+      self.assertTrue(set(M) <= A)
+      self.assertTrue(all( (a, b) in E or (b, a) in E for a, b in M.items() ))
+      for b in set(M.values()):
+         self.assertLessEqual(list(M.values()).count(b), capacity.get(b, 0))
+      return len(M)
+
+
+   def test_int_capacity(self):
+      A, B = { 'a0', 'a1', 'a2', 'a3' }, { 'b0', 'b1' }
+      E = { (a, b) for a in A for b in B }
+      M = D.capacitatedMatching(A, B, E, 2)
+      self.assertEqual(self.checkMatching(A, B, E, { 'b0': 2, 'b1': 2 }, M), 4)
+      self.assertEqual(len(D.capacitatedMatching(A, B, E, 1)), 2)
+
+
+   def test_dict_capacity(self):
+      A, B = { 'a0', 'a1', 'a2', 'a3' }, { 'b0', 'b1' }
+      E = { (a, b) for a in A for b in B }
+      M = D.capacitatedMatching(A, B, E, { 'b0': 3, 'b1': 1 })
+      self.assertEqual(self.checkMatching(A, B, E, { 'b0': 3, 'b1': 1 }, M), 4)
+
+
+   def test_missing_from_dict(self):
+      # b1 is not in the capacity dictionary, so takes no games
+      A, B = { 'a0', 'a1' }, { 'b0', 'b1' }
+      E = { ('a0', 'b0'), ('a1', 'b1'), ('b1', 'a0') }
+      self.assertEqual(D.capacitatedMatching(A, B, E, { 'b0': 5 }), { 'a0': 'b0' })
+
+
+   def test_brute_force(self):
+      for seed in range(40):
+         rng = random.Random(seed)
+         A, B, E = randomBipartite(rng.randint(0, 6), rng.randint(0, 4), 0.5, seed)
+         capacity = { b: rng.randint(0, 3) for b in sorted(B) if rng.random() < 0.9 }
+         M = D.capacitatedMatching(A, B, E, capacity)
+         self.assertEqual(self.checkMatching(A, B, E, capacity, M), capacitatedMatchingSize(A, E, capacity))
+
+
+if __name__ == '__main__':
+   unittest.main()
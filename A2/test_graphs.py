@@ -0,0 +1,402 @@
+#!/usr/bin/env python
+
+import copy
+import itertools
+import pickle
+import random
+import unittest
+from unittest import mock
+import graphs as G
+
+try:
+   import numpy
+except ImportError:
+   numpy = None
+
+def undirected(edges):
+   """Returns the symmetric edge set of the undirected graph with the given edges."""
+   return { (u, v) for (u, v) in edges } | { (v, u) for (u, v) in edges }
+
+def cycle(n):
+   return undirected({ (i, (i + 1) % n) for i in range(n) })
+
+def complete(n):
+   return { (u, v) for u in range(n) for v in range(n) if u != v }
+
+def randomGraph(n, p, seed):
+   rng = random.Random(seed)
+   return set(range(n)), undirected({ (u, v) for u in range(n) for v in range(u + 1, n) if rng.random() < p })
+
+def chromaticNumber(V, E):
+   """Brute force chromatic number, for checking minColouring on small graphs."""
+   V = list(V)
+   for k in range(len(V) + 1):
+      for colours in itertools.product(range(k), repeat=len(V)):
+         C = dict(zip(V, colours))
+         if all( C[u] != C[v] for u, v in E ): return k
+
+
+class TestShortestPath(unittest.TestCase):
+   def test_bidirectional_matches_default(self):
+      V, E = set(range(9)), cycle(9)
+      for end in V:
+         path = G.shortestPath(V, E, 0, end, bidirectional=True)
+         self.assertEqual(len(path), len(G.shortestPath(V, E, 0, end)))
+         self.assertEqual((path[0], path[-1]), (0, end))
+         self.assertTrue(all( (u, v) in E for u, v in zip(path, path[1:]) ))
+
+
+   def test_equal_endpoints(self):
+      V, E = { 1000, 1001 }, undirected({ (1000, 1001) })
+      for bidirectional in (False, True):
+         self.assertEqual(G.shortestPath(V, E, 1000, int('1000'), bidirectional=bidirectional), [ 1000 ])
+
+
+   def test_missing_endpoints(self):
+      E = undirected({ (0, 1) })
+      for bidirectional in (False, True):
+         self.assertIsNone(G.shortestPath({ 1 }, E, 0, 1, bidirectional=bidirectional))
+         self.assertIsNone(G.shortestPath({ 0 }, E, 0, 1, bidirectional=bidirectional))
+         self.assertIsNone(G.shortestPath({ 0, 1, 2 }, E, 0, 2, bidirectional=bidirectional))
+
+
+class TestMinColouring(unittest.TestCase):
+   def checkColouring(self, V, E, k, C):
+      self.assertEqual(set(C), set(V))
+      self.assertEqual(len(set(C.values())), k)
+      self.assertTrue(all( C[u] != C[v] for u, v in E ))
+
+
+   def test_known_graphs(self):
+      petersen = undirected({ (i, (i + 1) % 5) for i in range(5) } | { (i, i + 5) for i in range(5) }
+                            | { (5 + i, 5 + (i + 2) % 5) for i in range(5) })
+      for V, E, chi in [ (set(), set(), 0),
+                         ({ 0, 1, 2 }, set(), 1),
+                         (set(range(8)), cycle(8), 2),
+                         (set(range(7)), cycle(7), 3),
+                         (set(range(6)), complete(6), 6),
+                         (set(range(10)), petersen, 3) ]:
+         k, C = G.minColouring(V, E)
+         self.assertEqual(k, chi)
+         self.checkColouring(V, E, k, C)
+
+
+   def test_disconnected(self):
+      # K4 and a 5-cycle side by side, plus an isolated vertex
+      E = complete(4) | { (u + 10, v + 10) for u, v in cycle(5) }
+      V = set(range(4)) | set(range(10, 15)) | { 20 }
+      k, C = G.minColouring(V, E)
+      self.assertEqual(k, 4)
+      self.checkColouring(V, E, k, C)
+
+
+   def test_loop(self):
+      self.assertEqual(G.minColouring({ 0, 1 }, undirected({ (0, 1), (1, 1) })), (float('inf'), dict()))
+
+
+   def test_brute_force(self):
+      for seed in range(40):
+         V, E = randomGraph(7, 0.5, seed)
+         k, C = G.minColouring(V, E)
+         self.assertEqual(k, chromaticNumber(V, E))
+         self.checkColouring(V, E, k, C)
+
+
+   def test_workers(self):
+      # one component, so the search tree is split, and several components, coloured in parallel
+      V, E = randomGraph(25, 0.4, 1)
+      twoCopies = E | { (u + 100, v + 100) for u, v in E }
+      for V, E in [ (V, E), (V | { v + 100 for v in V }, twoCopies) ]:
+         k, C = G.minColouring(V, E)
+         k2, C2 = G.minColouring(V, E, workers=2)
+         self.assertEqual(k2, k)
+         self.checkColouring(V, E, k2, C2)
+
+
+class TestBipartition(unittest.TestCase):
+   def checkOddCycle(self, E, cycle):
+      self.assertEqual(len(cycle) % 2, 1)
+      self.assertEqual(len(set(cycle)), len(cycle))
+      self.assertTrue(all( (cycle[i], cycle[(i + 1) % len(cycle)]) in E for i in range(len(cycle)) ))
+
+
+   def test_bipartite(self):
+      # an even cycle and a path, as two components
+      E = cycle(6) | undirected({ (10, 11), (11, 12) })
+      V = set(range(6)) | { 10, 11, 12, 20 }
+      (A, B), cycleFound = G.bipartitionWitness(V, E)
+      self.assertIsNone(cycleFound)
+      self.assertEqual(A | B, V)
+      self.assertEqual(A & B, set())
+      self.assertTrue(all( (u in A) != (v in A) for u, v in E ))
+      self.assertEqual(G.bipartition(V, E), (A, B))
+
+
+   def test_odd_cycle(self):
+      for n in (3, 5, 9):
+         partition, cycleFound = G.bipartitionWitness(set(range(n)), cycle(n))
+         self.assertIsNone(partition)
+         self.checkOddCycle(cycle(n), cycleFound)
+
+
+   def test_random(self):
+      for seed in range(40):
+         V, E = randomGraph(9, 0.25, seed)
+         partition, cycleFound = G.bipartitionWitness(V, E)
+         self.assertEqual(partition is None, G.minColouring(V, E)[0] > 2)
+         if partition is None:
+            self.checkOddCycle(E, cycleFound)
+         else:
+            A, B = partition
+            self.assertTrue(all( (u in A) != (v in A) for u, v in E ))
+
+
+   def test_loop(self):
+      self.assertEqual(G.bipartitionWitness({ 0, 1 }, undirected({ (0, 1), (1, 1) })), (None, [ 1 ]))
+
+
+class TestDistancesFrom(unittest.TestCase):
+   def test_distances_from(self):
+      V, E = set(range(9)), cycle(9)
+      self.assertEqual(G.distancesFrom(V, E, 0), { v: min(v, 9 - v) for v in V })
+
+
+   def test_distances_from_set(self):
+      V, E = set(range(9)), cycle(9)
+      self.assertEqual(G.distancesFromSet(V, E, { 0, 4 }), { 0: 0, 1: 1, 2: 2, 3: 1, 4: 0, 5: 1, 6: 2, 7: 2, 8: 1 })
+      self.assertEqual(G.distancesFromSet(V, E, { 0 }), G.distancesFrom(V, E, 0))
+
+
+   def test_unreachable(self):
+      # only the vertices reachable from u are keys, and only vertices of V are used
+      V, E = set(range(6)) | { 10, 11 }, cycle(6) | undirected({ (10, 11) })
+      self.assertEqual(set(G.distancesFrom(V, E, 0)), set(range(6)))
+      self.assertEqual(G.distancesFrom(V - { 1 }, E, 0), { 0: 0, 5: 1, 4: 2, 3: 3, 2: 4 })
+      self.assertEqual(G.distancesFromSet(V, E, { 0, 10 })[11], 1)
+
+
+   def test_matches_distance_classes(self):
+      for seed in range(10):
+         V, E = randomGraph(15, 0.15, seed)
+         dist = G.distancesFrom(V, E, 0)
+         for j, Dj in enumerate(G.distanceClasses(V, E, 0)):
+            self.assertEqual(Dj, { v for v in dist if dist[v] == j })
+
+
+class TestAllDistances(unittest.TestCase):
+   @unittest.skipIf(numpy is None, 'allDistances needs NumPy')
+   def test_all_distances(self):
+      for seed in range(10):
+         V, E = randomGraph(15, 0.12, seed)
+         V.add('isolated')
+         M, index = G.allDistances(V, E)
+         self.assertEqual(set(index), V)
+         self.assertEqual(M.shape, (len(V), len(V)))
+         for u in V:
+            dist = G.distancesFrom(V, E, u)
+            for v in V:
+               self.assertEqual(M[index[u], index[v]], dist.get(v, float('inf')))
+
+
+   @unittest.skipIf(numpy is None, 'allDistances needs NumPy')
+   def test_all_distances_empty(self):
+      M, index = G.allDistances(set(), set())
+      self.assertEqual((M.shape, index), ((0, 0), dict()))
+
+
+class TestIndexedGraph(unittest.TestCase):
+   def setUp(self):
+      self.V, self.E = set(range(6)) | { 'isolated' }, cycle(6)
+      self.G = G.IndexedGraph(self.V, self.E)
+
+
+   def test_edge_set(self):
+      self.assertEqual(self.G, self.E)
+      self.assertEqual(self.G.V, self.V)
+      self.assertEqual(self.G.adj[0], { 1, 5 })
+      self.assertEqual(self.G.adj['isolated'], set())
+
+
+   def test_same_answers(self):
+      for f in (G.N, G.degree):
+         for u in self.V:
+            self.assertEqual(f(self.V, self.G, u), f(self.V, self.E, u))
+      self.assertEqual(G.NS({ 0, 1, 2 }, self.G, { 3 }), { 2 })
+      self.assertEqual(G.isIndependentSet({ 0, 2, 4 }, self.G), True)
+      self.assertEqual(G.isIndependentSet({ 0, 1 }, self.G), False)
+      self.assertEqual(G.components(self.V, self.G), G.components(self.V, self.E))
+
+
+   def test_not_symmetric(self):
+      with self.assertRaises(ValueError):
+         G.IndexedGraph({ 0, 1 }, { (0, 1) })
+      self.assertEqual(G.IndexedGraph({ 0, 1 }, { (0, 1) }, trusted=True), { (0, 1) })
+
+
+   def test_copy_and_pickle(self):
+      for H in (copy.copy(self.G), copy.deepcopy(self.G), pickle.loads(pickle.dumps(self.G))):
+         self.assertIsInstance(H, G.IndexedGraph)
+         self.assertEqual(H, self.G)
+         self.assertEqual(H.V, self.G.V)
+         self.assertEqual(H.adj, self.G.adj)
+
+
+class TestSymmetryCheck(unittest.TestCase):
+   def test_checked_once(self):
+      V, E = set(range(5)), cycle(5)
+      with mock.patch.object(G, '_assertSymmetric', wraps=G._assertSymmetric) as check:
+         for u in V:
+            G.N(V, E, u)
+         self.assertEqual(check.call_count, 1)
+
+
+   def test_changed_edge_set(self):
+      V, E = set(range(5)), cycle(5)
+      G.N(V, E, 0)
+      E.add((0, 2))                        # no longer symmetric, and a different size
+      with self.assertRaises(ValueError):
+         G.N(V, E, 0)
+      E.add((2, 0))
+      self.assertEqual(G.N(V, E, 0), { 1, 2, 4 })
+
+
+   def test_not_symmetric(self):
+      with self.assertRaises(ValueError):
+         G.N({ 0, 1 }, { (0, 1) }, 0)
+      with self.assertRaises(ValueError):
+         G.N({ 0, 1 }, [ (0, 1) ], 0)      # lists can't be cached, but are still checked
+
+
+   def test_trusted(self):
+      with mock.patch.object(G, 'trusted', True):
+         self.assertEqual(G.N({ 0, 1 }, { (0, 1) }, 0), { 1 })
+
+
+class TestColouring(unittest.TestCase):
+   def test_classes(self):
+      C = G.Colouring({ 'a': 0, 'b': 1, 'c': 0 })
+      self.assertEqual(dict(C), { 'a': 0, 'b': 1, 'c': 0 })
+      self.assertEqual(C.classes, { 0: { 'a', 'c' }, 1: { 'b' } })
+      self.assertCountEqual(C.partition(), [ { 'a', 'c' }, { 'b' } ])
+
+
+   def test_recolour(self):
+      C = G.Colouring({ 'a': 0, 'b': 1, 'c': 0 })
+      C['a'] = 1
+      self.assertEqual(C['a'], 1)
+      self.assertEqual(C.classes, { 0: { 'c' }, 1: { 'a', 'b' } })
+      C['d'] = 2
+      self.assertEqual(C.classes, { 0: { 'c' }, 1: { 'a', 'b' }, 2: { 'd' } })
+      self.assertEqual(len(C), 4)
+
+
+   def test_delete_last_of_class(self):
+      C = G.Colouring({ 'a': 0, 'b': 1, 'c': 0 })
+      del C['b']
+      self.assertNotIn('b', C)
+      self.assertEqual(C.classes, { 0: { 'a', 'c' } })
+      self.assertEqual(C.partition(), [ { 'a', 'c' } ])
+      C['c'] = 1                           # recolouring the last vertex of a class also removes the class
+      C['a'] = 1
+      self.assertEqual(C.classes, { 1: { 'a', 'c' } })
+      with self.assertRaises(KeyError):
+         del C['b']
+
+
+   def test_matches_colour_classes(self):
+      V, E = randomGraph(12, 0.4, 3)
+      k, C = G.minColouring(V, E)
+      self.assertCountEqual(G.Colouring(C).partition(), G.colourClassesFromColouring(C))
+      self.assertEqual(len(G.colourClassesFromColouring(C)), k)
+
+
+class TestShortestPaths(unittest.TestCase):
+   def test_targets(self):
+      # a 6-cycle and a separate edge
+      V, E = set(range(6)) | { 10, 11 }, cycle(6) | undirected({ (10, 11) })
+      paths = G.shortestPaths(V, E, 0, { 0, 2, 3, 11, 'missing' })
+      self.assertEqual(set(paths), { 0, 2, 3, 11, 'missing' })
+      self.assertEqual(paths[0], [ 0 ])
+      self.assertEqual(paths[2], [ 0, 1, 2 ])
+      self.assertEqual(len(paths[3]), 4)
+      self.assertIsNone(paths[11])         # unreachable
+      self.assertIsNone(paths['missing'])  # not a vertex
+
+
+   def test_long_path(self):
+      n = 20000                            # far deeper than the recursion limit
+      V, E = set(range(n + 1)), undirected({ (i, i + 1) for i in range(n) })
+      self.assertEqual(G.shortestPaths(V, E, 0, { n })[n], list(range(n + 1)))
+      self.assertEqual(G.shortestPath(V, E, 0, n), list(range(n + 1)))
+
+
+   def test_path_from_tree(self):
+      parents = { 'r': None, 'a': 'r', 'b': 'a', 'c': 'r' }
+      self.assertEqual(G.pathFromTree(parents, 'b'), [ 'r', 'a', 'b' ])
+      self.assertEqual(G.pathFromTree(parents, 'r'), [ 'r' ])
+      self.assertIsNone(G.pathFromTree(parents, 'z'))
+
+
+class TestIterSpanningTree(unittest.TestCase):
+   def test_breadth_first(self):
+      V, E = randomGraph(20, 0.15, 2)
+      dist = G.distancesFrom(V, E, 0)
+      visits = list(G.iterSpanningTree(V, E, 0))
+      self.assertEqual(visits[0], (0, None, 0))
+      self.assertEqual([ depth for v, parent, depth in visits ], sorted( depth for v, parent, depth in visits ))
+      for v, parent, depth in visits[1:]:
+         self.assertEqual(depth, dist[v])
+         self.assertEqual(dist[parent], depth - 1)
+         self.assertIn((parent, v), E)
+      self.assertEqual({ v for v, parent, depth in visits }, set(dist))
+
+
+   def test_matches_spanning_tree(self):
+      for seed in range(10):
+         V, E = randomGraph(15, 0.2, seed)
+         self.assertEqual({ v: parent for v, parent, depth in G.iterSpanningTree(V, E, 0) }, G.spanningTree(V, E, 0))
+
+
+   def test_stop_early(self):
+      n = 1000
+      V, E = set(range(n)), undirected({ (i, i + 1) for i in range(n - 1) })
+      visits = G.iterSpanningTree(V, E, 0)
+      near = list(itertools.takewhile(lambda visit: visit[2] <= 2, visits))
+      self.assertEqual(near, [ (0, None, 0), (1, 0, 1), (2, 1, 2) ])
+      self.assertEqual(next(visits), (4, 3, 4))   # takewhile used up (3, 2, 3), and the search carries on lazily
+
+
+class TestApproxColouring(unittest.TestCase):
+   def test_bounds(self):
+      for seed in range(20):
+         V, E = randomGraph(14, 0.4, seed)
+         k, C, klower = G.approxColouring(V, E, timeLimit=0.05, seed=seed)
+         self.assertEqual(set(C), V)
+         self.assertTrue(all( C[u] != C[v] for u, v in E ))
+         self.assertEqual(len(set(C.values())), k)
+         chi = G.minColouring(V, E)[0]
+         self.assertLessEqual(klower, chi)
+         self.assertLessEqual(chi, k)
+
+
+   def test_seed(self):
+      # the greedy colourings use 6 colours here and iterated greedy gets down to the clique size, 5, so
+      # the search stops on reaching klower rather than at the time limit, after the same rounds each time
+      V, E = randomGraph(30, 0.3, 9)
+      first = G.approxColouring(V, E, timeLimit=10, seed=1)
+      self.assertEqual(first[0], first[2])
+      self.assertEqual(first, G.approxColouring(V, E, timeLimit=10, seed=1))
+
+
+   def test_easy_graphs(self):
+      self.assertEqual(G.approxColouring(set(), set())[0], 0)
+      k, C, klower = G.approxColouring(set(range(6)), cycle(6))
+      self.assertEqual((k, klower), (2, 2))
+
+
+   def test_loop(self):
+      self.assertEqual(G.approxColouring({ 0, 1 }, undirected({ (0, 1), (1, 1) })), (float('inf'), dict(), float('inf')))
+
+
+if __name__ == '__main__':
+   unittest.main()
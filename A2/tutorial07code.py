@@ -16,9 +16,6 @@ def distances1(V, E, u):
 def distances2(V, E, u):
    return { v: graphs.distance(V, E, u, v) for v in V }
 
-print(distances1(V, E, u))
-print(distances2(V, E, u))
-
 def distances3(V, E, u):
    d = dict()
    D = graphs.distanceClasses(V, E, u)
@@ -33,5 +30,12 @@ def distances4(V, E, u):
    D = graphs.distanceClasses(V, E, u)
    return { v: dist  for dist, distClass in enumerate(D)  for v in distClass }
 
-print(distances3(V, E, u))
-print(distances4(V, E, u))
+def distances5(V, E, u):
+   return graphs.distancesFrom(V, E, u)
+
+if __name__ == '__main__':
+   print(distances1(V, E, u))
+   print(distances2(V, E, u))
+   print(distances3(V, E, u))
+   print(distances4(V, E, u))
+   print(distances5(V, E, u))